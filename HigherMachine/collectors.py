@@ -0,0 +1,287 @@
+"""
+系统信息采集器
+
+每个采集项独立运行在线程池中，并有各自的时间预算。超过预算仍未返回的采集项沿用上一次的值，
+并在结果的 'stale' 中标记，因此一帧的采集耗时受预算限制，而不取决于最慢的那次psutil调用。
+仍在运行的采集项不会被重复提交，等它返回后其结果会在下一帧被采用。
+
+提供两种后端:
+    psutil_collectors()  跨平台，依赖psutil
+    proc_collectors()    仅Linux，常驻打开/proc文件并用preadv读入复用的缓冲区，
+                         只在缓冲区中原地解析需要的字段，适合负载很高的生产主机
+"""
+import collections
+import concurrent.futures
+import os
+import time
+
+# 默认时间预算（秒）
+DEFAULT_BUDGET = 0.2
+
+
+class Collector:
+    """单个采集项：fn() 返回包含若干字段的字典"""
+
+    def __init__(self, name, fn, default, budget=DEFAULT_BUDGET):
+        self.name = name
+        self.fn = fn
+        self.budget = budget
+        self.value = default      # 最近一次成功采集的结果
+        self.future = None        # 正在运行的任务
+        self.stale = False
+        self.misses = 0           # 超时次数
+        self.errors = 0           # 异常次数
+
+
+class NetworkRate:
+    """根据两次调用之间的计数器差值计算网络速率（每秒字节数）"""
+
+    def __init__(self, counters_fn):
+        self.counters_fn = counters_fn
+        self.last_io = counters_fn()
+        self.last_time = time.monotonic()
+
+    def __call__(self):
+        now = time.monotonic()
+        current_io = self.counters_fn()
+        time_delta = now - self.last_time
+
+        if time_delta > 0:
+            sent = int((current_io.bytes_sent - self.last_io.bytes_sent) / time_delta)
+            recv = int((current_io.bytes_recv - self.last_io.bytes_recv) / time_delta)
+        else:
+            sent = 0
+            recv = 0
+
+        self.last_io = current_io
+        self.last_time = now
+        return {"net_sent": sent, "net_recv": recv}
+
+
+def _apply_budgets(collectors, budgets):
+    """按名称覆盖各采集项的时间预算"""
+    budgets = budgets or {}
+    for collector in collectors:
+        collector.budget = budgets.get(collector.name, collector.budget)
+    return collectors
+
+
+def psutil_collectors(budgets=None):
+    """基于psutil的采集项列表，budgets可按名称覆盖时间预算"""
+    import psutil
+
+    # 首次调用CPU监控，初始化基准
+    psutil.cpu_percent(interval=None)
+    collectors = [
+        Collector("cpu", lambda: {"cpu": psutil.cpu_percent(interval=None)}, {"cpu": 0.0}),
+        Collector("memory", lambda: {"memory": psutil.virtual_memory().percent}, {"memory": 0.0}),
+        Collector("processes", lambda: {"processes": len(psutil.pids())}, {"processes": 0}),
+        Collector("network", NetworkRate(psutil.net_io_counters), {"net_sent": 0, "net_recv": 0}),
+    ]
+    return _apply_budgets(collectors, budgets)
+
+
+NetIO = collections.namedtuple('NetIO', 'bytes_sent bytes_recv')
+
+
+class ProcFile:
+    """常驻打开的/proc文件，每次从偏移0重新读取到复用的缓冲区，字段直接在缓冲区中解析"""
+
+    def __init__(self, path, size=4096):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY)
+        self.buf = bytearray(size)
+
+    def read(self, whole=True):
+        """
+        重新读取文件到buf，返回有效长度
+        whole=False时只读一个缓冲区大小，适合只需要开头几行的文件
+        """
+        with memoryview(self.buf) as view:
+            n = os.preadv(self.fd, [view], 0)
+        while whole and n == len(self.buf):
+            # 缓冲区已满，扩容后继续读剩余部分
+            self.buf.extend(bytes(len(self.buf)))
+            with memoryview(self.buf) as view:
+                n += os.preadv(self.fd, [view[n:]], n)
+        return n
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _parse_uint(buf, i, end):
+    """跳过空白后原地解析十进制无符号整数，返回 (数值, 数字之后的位置)"""
+    while i < end and buf[i] in (32, 9):
+        i += 1
+    value = 0
+    while i < end and 48 <= buf[i] <= 57:
+        value = value * 10 + buf[i] - 48
+        i += 1
+    return value, i
+
+
+class ProcCpu:
+    """由/proc/stat首行的累计时间计算CPU利用率"""
+
+    def __init__(self, stat):
+        self.stat = stat
+        self.last = self._times()
+
+    def _times(self):
+        """返回 (busy, total) 累计节拍数"""
+        stat = self.stat
+        n = stat.read(whole=False)
+        buf = stat.buf
+        # cpu user nice system idle iowait irq softirq steal ...
+        i = buf.find(b' ', 0, n)
+        total = 0
+        idle = 0
+        for field in range(8):
+            value, i = _parse_uint(buf, i, n)
+            total += value
+            if field in (3, 4):
+                idle += value
+        return total - idle, total
+
+    def __call__(self):
+        busy, total = self._times()
+        last_busy, last_total = self.last
+        self.last = (busy, total)
+        if total <= last_total:
+            return {"cpu": 0.0}
+        return {"cpu": round((busy - last_busy) * 100 / (total - last_total), 1)}
+
+
+def _meminfo_value(buf, n, key):
+    """从/proc/meminfo内容中取出某一项的数值（kB）"""
+    start = buf.find(key, 0, n)
+    if start < 0:
+        return None
+    return _parse_uint(buf, start + len(key), n)[0]
+
+
+def proc_memory(meminfo):
+    """由MemTotal/MemAvailable计算内存利用率（与psutil一致）"""
+    n = meminfo.read(whole=False)
+    buf = meminfo.buf
+    total = _meminfo_value(buf, n, b'MemTotal:')
+    available = _meminfo_value(buf, n, b'MemAvailable:')
+    if available is None:
+        available = _meminfo_value(buf, n, b'MemFree:')
+    return {"memory": round((total - available) * 100 / total, 1)}
+
+
+def proc_tasks(loadavg):
+    """
+    由/proc/loadavg第4列 "运行数/总数" 取总任务数，只读一个常驻打开的小文件，不遍历pid目录
+    注意：内核统计的是调度实体数（含线程），数值大于psutil.pids()的进程数
+    """
+    n = loadavg.read()
+    buf = loadavg.buf
+    slash = buf.find(b'/', 0, n)
+    return {"processes": _parse_uint(buf, slash + 1, n)[0]}
+
+
+def proc_processes(proc='/proc'):
+    """
+    统计/proc下的数字目录，即进程数（与psutil.pids()一致）
+    需要遍历所有pid目录，开销随进程数增长，只在 proc_collectors(count_processes=True) 时使用
+    """
+    count = 0
+    with os.scandir(proc) as entries:
+        for entry in entries:
+            if entry.name.isdigit():
+                count += 1
+    return {"processes": count}
+
+
+def proc_net_counters(netdev):
+    """汇总/proc/net/dev中所有接口的收发字节数"""
+    n = netdev.read()
+    buf = netdev.buf
+    sent = 0
+    recv = 0
+    # 前两行是表头
+    i = buf.find(b'\n', buf.find(b'\n', 0, n) + 1, n) + 1
+    while 0 < i < n:
+        end = buf.find(b'\n', i, n)
+        if end < 0:
+            end = n
+        colon = buf.find(b':', i, end)
+        if colon >= 0:
+            # 接收字节数 包数 错误 丢弃 fifo frame compressed multicast 发送字节数 ...
+            value, j = _parse_uint(buf, colon + 1, end)
+            recv += value
+            for _ in range(8):
+                value, j = _parse_uint(buf, j, end)
+            sent += value
+        i = end + 1
+    return NetIO(sent, recv)
+
+
+def proc_collectors(budgets=None, count_processes=False):
+    """
+    基于/proc直接读取的采集项列表（仅Linux），budgets可按名称覆盖时间预算
+    processes字段默认为/proc/loadavg中的任务数（含线程）；count_processes为True时改为遍历/proc统计进程数
+    """
+    stat = ProcFile('/proc/stat')
+    meminfo = ProcFile('/proc/meminfo')
+    netdev = ProcFile('/proc/net/dev')
+    if count_processes:
+        processes = proc_processes
+    else:
+        loadavg = ProcFile('/proc/loadavg', 128)
+        processes = lambda: proc_tasks(loadavg)
+    collectors = [
+        Collector("cpu", ProcCpu(stat), {"cpu": 0.0}),
+        Collector("memory", lambda: proc_memory(meminfo), {"memory": 0.0}),
+        Collector("processes", processes, {"processes": 0}),
+        Collector("network", NetworkRate(lambda: proc_net_counters(netdev)),
+                  {"net_sent": 0, "net_recv": 0}),
+    ]
+    return _apply_budgets(collectors, budgets)
+
+
+class CollectorSet:
+    """并发运行一组采集项，并按各自预算收集结果"""
+
+    def __init__(self, collectors):
+        self.collectors = collectors
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(collectors), thread_name_prefix="collector")
+
+    def collect(self):
+        """采集一次，返回合并后的字段字典，超时的采集项名称列在 'stale' 中"""
+        start = time.monotonic()
+        for collector in self.collectors:
+            if collector.future is None:
+                collector.future = self.executor.submit(collector.fn)
+
+        data = {}
+        stale = []
+        for collector in sorted(self.collectors, key=lambda c: c.budget):
+            remaining = start + collector.budget - time.monotonic()
+            try:
+                collector.value = collector.future.result(timeout=max(0, remaining))
+                collector.stale = False
+                collector.future = None
+            except concurrent.futures.TimeoutError:
+                collector.stale = True
+                collector.misses += 1
+            except Exception as e:
+                print(f"Collector {collector.name} failed: {e}")
+                collector.stale = True
+                collector.errors += 1
+                collector.future = None
+
+            data.update(collector.value)
+            if collector.stale:
+                stale.append(collector.name)
+
+        data["stale"] = tuple(stale)
+        return data
+
+    def close(self):
+        """关闭线程池，不等待仍在运行的采集项"""
+        self.executor.shutdown(wait=False)
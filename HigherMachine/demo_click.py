@@ -1,32 +1,47 @@
-import serial
-import time
+import asyncio
+import sys
 
-# 配置串行通信参数  
-com_port = 'COM31'  # Windows上的COM端口号，Linux/macOS上可能是'/dev/ttyUSB0'或类似
+from event_reader import EventReader
+from transport import open_transport
+
+# 配置通信参数
+com_port = 'COM31'  # Windows上的COM端口号，Linux/macOS上可能是'/dev/ttyUSB0'或类似，也可以是 transport.py 支持的URL
 baud_rate = 115200  # 波特率，根据您的需要设置  
 
-# 打开串行端口  
+# 命令行参数可指定传输URL
+url = sys.argv[1] if len(sys.argv) > 1 else com_port
+
+# 打开端口
 try:
-    ser = serial.Serial(com_port, baud_rate, timeout=1)  # timeout是读取超时时间，单位是秒  
-    print(f"Opened {com_port} successfully.")
-except serial.SerialException as e:
-    print(f"Failed to open {com_port}: {e}")
+    ser = open_transport(url, baud_rate)  # 读取超时时间为1秒
+    print(f"Opened {url} successfully.")
+except (OSError, ValueError) as e:
+    print(f"Failed to open {url}: {e}")
     exit(1)
 
-# 读取数据的循环  
-try:
+def on_click(event):
+    """点击事件处理"""
+    print(f"Received click: {event.data}")
+
+def on_text(event):
+    """其他文本"""
+    print(f"Received data: {event.data}")
+
+async def main():
+    reader = EventReader(ser)
+    reader.on('click', on_click)
+    reader.on('text', on_text)
+    # 有数据到达时才会被唤醒，不再轮询
+    reader.start()
     while True:
-        # 检查是否有数据可读  
-        if ser.in_waiting > 0:
-            # 读取一行数据（假设数据是以换行符分隔的）  
-            line = ser.readline().decode('utf-8').strip()  # decode将字节转换为字符串，strip去除末尾的换行符  
-            print(f"Received data: {line}")
-
-            # 如果没有数据可读，稍作等待以避免CPU占用过高
-        time.sleep(0.1)  # 等待0.1秒  
+        await asyncio.sleep(10)
+        print(reader.status())
+
+try:
+    asyncio.run(main())
 except KeyboardInterrupt:
-    # 如果用户按下Ctrl+C终止程序，关闭串行端口  
-    print("Closing serial port...")
+    # 如果用户按下Ctrl+C终止程序，关闭端口  
+    print("Closing port...")
 finally:
     ser.close()
-    print("Serial port closed.")
\ No newline at end of file
+    print("Port closed.")
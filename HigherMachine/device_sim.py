@@ -0,0 +1,105 @@
+"""
+模拟下位机 - 在没有开发板的Linux机器上接收并解码遥测帧，统计吞吐
+
+用法（两个终端）:
+    python system_monitor.py pty:// --interval 0.1     # 打印出从端路径，如 /dev/pts/3
+    python device_sim.py tty:///dev/pts/3
+"""
+import argparse
+import sys
+import time
+
+import frame_codec
+from transport import open_transport
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="模拟下位机")
+    parser.add_argument('url', help="传输URL，如 tty:///dev/pts/3、tcp-listen://:9000")
+    parser.add_argument('--report', type=float, default=1.0, help="统计输出间隔（秒）")
+    parser.add_argument('--verbose', action='store_true', help="打印每一帧")
+    parser.add_argument('--credit', type=int, default=-1, help="每次确认授信的帧数（流控），默认不启用")
+    parser.add_argument('--render-ms', type=float, default=0.0, help="模拟每帧的刷新耗时（毫秒）")
+    parser.add_argument('--backfill', type=int, default=0, help="启动时请求回填的样本数")
+    args = parser.parse_args(argv)
+
+    port = open_transport(args.url)
+    print(f"Opened {getattr(port, 'name', args.url)} successfully.")
+    if args.backfill:
+        port.write(b'{"type": "backfill", "count": %d}\n' % args.backfill)
+
+    state = {}
+    synced = False
+    frames = 0
+    deltas = 0
+    skipped = 0
+    history = []
+    last_seq = None
+    lost = 0
+    reorders = 0
+    last_report = time.monotonic()
+    last_frames = 0
+
+    try:
+        while True:
+            try:
+                msg = frame_codec.read_message(port)
+            except ValueError as e:
+                print(f"Bad frame: {e}")
+                continue
+
+            if msg is not None and 'b' in msg:
+                # 批量回填帧：第一帧清空历史
+                if msg.get('r'):
+                    history = []
+                history.extend(msg['b'])
+                print(f"Backfill: {len(msg['b'])} samples, history={len(history)}")
+                msg = None
+
+            if msg is not None:
+                # 与下位机一致：关键帧之前的增量帧丢弃
+                if msg.pop('d', None):
+                    deltas += 1
+                    if not synced:
+                        skipped += 1
+                        msg = None
+                else:
+                    synced = True
+            if msg is not None:
+                seq = msg.pop('seq', None)
+                ts = msg.pop('ts', None)
+                state.update(msg)
+                frames += 1
+                if args.verbose:
+                    print(f"Frame: {state}")
+                if seq is not None:
+                    # 与下位机一致：统计序号缺口，刷新后回送确认（hold为模拟的刷新耗时）
+                    gap = 0 if last_seq is None else (seq - last_seq - 1) % frame_codec.SEQ_MODULO
+                    if gap >= frame_codec.SEQ_MODULO // 2:
+                        reorders += 1
+                    else:
+                        lost += gap
+                        last_seq = seq
+                    if args.render_ms:
+                        time.sleep(args.render_ms / 1000)
+                    ack = b'{"type": "ack", "seq": %d, "ts": %d, "hold": %d' % (seq, ts, args.render_ms)
+                    if args.credit >= 0:
+                        ack += b', "credit": %d' % args.credit
+                    port.write(ack + b'}\n')
+
+            now = time.monotonic()
+            if now - last_report >= args.report:
+                rate = (frames - last_frames) / (now - last_report)
+                print(f"frames={frames} deltas={deltas} skipped={skipped} lost={lost} "
+                      f"reorders={reorders} rate={rate:.1f}/s")
+                last_report = now
+                last_frames = frames
+    except KeyboardInterrupt:
+        pass
+    finally:
+        port.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
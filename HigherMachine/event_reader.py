@@ -0,0 +1,200 @@
+"""
+下位机事件读取器（asyncio）
+
+在可读时才被唤醒（loop.add_reader），把收到的数据按行拆分解析成事件，分发给注册的处理函数。
+不再轮询 in_waiting + sleep，空闲时不占用CPU，事件也不会被额外延迟最多100ms。
+与采样器运行在同一个事件循环中时，一个进程即可同时处理上下行数据。
+
+事件格式:
+    {"type": "xxx", ...}          JSON行，事件类型取type字段
+    Button clicked at 12345       LowerMachine/demo_click.py 发送的点击事件，12345为设备ticks_ms
+    其他文本                       类型为 'text'
+
+每类事件统计两种延迟:
+    receive  该行第一个字节被读到到分发给处理函数的时间
+    transit  带设备时间戳的事件，(主机接收时刻 - 设备时刻) 相对历史最小值的差，
+             即单向传输延迟中超出最佳情况的部分（两端时钟无需同步）
+"""
+import asyncio
+import collections
+import json
+import os
+import sys
+import threading
+import time
+
+Event = collections.namedtuple('Event', 'source kind data device_ms received')
+
+CLICK_PREFIX = 'Button clicked at '
+
+# 偏移量比最小值大出这么多（ms）时，认为设备重启或ticks_ms回绕，重新建立基准
+OFFSET_RESET_MS = 60000
+
+
+class LatencyStats:
+    """延迟计数器（秒）"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.last = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def __str__(self):
+        return f"n={self.count} mean={self.mean * 1000:.1f}ms max={self.max * 1000:.1f}ms"
+
+
+def parse_event(line, source, received):
+    """将一行文本解析为事件"""
+    if line.startswith('{'):
+        try:
+            data = json.loads(line)
+        except ValueError:
+            return Event(source, 'text', line, None, received)
+        return Event(source, data.get('type', 'json'), data, data.get('ticks_ms'), received)
+    if line.startswith(CLICK_PREFIX):
+        try:
+            device_ms = int(line[len(CLICK_PREFIX):])
+        except ValueError:
+            device_ms = None
+        return Event(source, 'click', line, device_ms, received)
+    return Event(source, 'text', line, None, received)
+
+
+class EventReader:
+    """从一个传输读取事件并分发"""
+
+    def __init__(self, port, name=None):
+        self.port = port
+        self.name = name or getattr(port, 'name', '')
+        self.handlers = collections.defaultdict(list)
+        self.buffer = bytearray()
+        self.first_byte_time = None   # 缓冲区中未完成的行第一个字节的读取时刻
+        self.loop = None
+        self.thread = None
+        self.running = False          # 读线程的停止标志
+
+        # 统计
+        self.events = 0
+        self.receive_latency = collections.defaultdict(LatencyStats)
+        self.transit_latency = collections.defaultdict(LatencyStats)
+        self.min_offset = {}          # 各事件类型 (主机ms - 设备ms) 的最小值
+
+    def on(self, kind, handler):
+        """注册处理函数，kind为 '*' 时接收所有事件"""
+        self.handlers[kind].append(handler)
+        return handler
+
+    def start(self, loop=None):
+        """挂到事件循环上；端口没有可用的文件描述符时（如Windows串口）退回到读线程"""
+        self.loop = loop or asyncio.get_running_loop()
+        self.running = True
+        try:
+            fd = self.port.fileno()
+            if sys.platform == 'win32':
+                raise OSError("add_reader is not supported for serial ports on Windows")
+            self.loop.add_reader(fd, self._on_readable)
+        except (AttributeError, OSError, NotImplementedError):
+            self.thread = threading.Thread(target=self._read_thread, name="event-reader", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """停止监听；读线程在当前一次读取返回后退出"""
+        self.running = False
+        if self.loop is not None and self.thread is None:
+            try:
+                self.loop.remove_reader(self.port.fileno())
+            except (AttributeError, OSError, ValueError):
+                pass
+
+    def _on_readable(self):
+        """fd可读时由事件循环调用，只读取当前已到达的数据，不阻塞"""
+        try:
+            if hasattr(self.port, 'buffer') and self.port.buffer:
+                # FdTransport内部可能已缓存了部分数据
+                chunk = bytes(self.port.buffer)
+                self.port.buffer.clear()
+            else:
+                chunk = os.read(self.port.fileno(), 4096)
+        except OSError:
+            chunk = b''
+        if not chunk:
+            # 对端关闭，停止监听以免事件循环空转
+            self.stop()
+            return
+        self.feed(chunk, time.monotonic())
+
+    def _read_thread(self):
+        """没有文件描述符可用时的后备方案：阻塞读取，再切回事件循环分发"""
+        while self.running:
+            try:
+                line = self.port.readline()
+            except (OSError, ValueError):
+                # 端口已关闭
+                return
+            if not line or not self.running:
+                continue
+            if self.loop.is_closed():
+                return
+            try:
+                self.loop.call_soon_threadsafe(self.feed, line, time.monotonic())
+            except RuntimeError:
+                # 事件循环在检查之后关闭
+                return
+
+    def feed(self, chunk, now):
+        """喂入收到的数据，分发其中所有完整的行"""
+        if not self.buffer:
+            self.first_byte_time = now
+        self.buffer += chunk
+        while True:
+            end = self.buffer.find(b'\n')
+            if end < 0:
+                break
+            raw = bytes(self.buffer[:end])
+            del self.buffer[:end + 1]
+            line = raw.decode('utf-8', 'replace').strip()
+            received = self.first_byte_time
+            # 剩余部分属于下一行，从本次读取时刻开始计时
+            self.first_byte_time = now
+            if line:
+                self.dispatch(parse_event(line, self.name, received))
+
+    def dispatch(self, event):
+        now = time.monotonic()
+        self.events += 1
+        self.receive_latency[event.kind].add(now - event.received)
+
+        if event.device_ms is not None:
+            offset = event.received * 1000 - event.device_ms
+            best = self.min_offset.get(event.kind)
+            if best is None or offset < best or offset - best > OFFSET_RESET_MS:
+                self.min_offset[event.kind] = best = offset
+            self.transit_latency[event.kind].add((offset - best) / 1000)
+
+        for handler in self.handlers.get(event.kind, []) + self.handlers.get('*', []):
+            try:
+                handler(event)
+            except Exception as e:
+                print(f"Event handler failed: {e}")
+
+    def status(self):
+        """各类事件的延迟统计"""
+        parts = []
+        for kind, stats in self.receive_latency.items():
+            part = f"{kind}: receive {stats}"
+            if kind in self.transit_latency:
+                part += f", transit {self.transit_latency[kind]}"
+            parts.append(part)
+        return f"{self.name}: " + "; ".join(parts)
@@ -0,0 +1,227 @@
+"""
+多屏分发 - 一个采样进程驱动多块显示板
+
+每块显示板有独立的传输、写线程、发送间隔和编码方式。每次采样只做一次，
+相同格式的完整帧也只编码一次，由所有使用该格式的显示板共享；增量编码依赖各自已发送的内容，
+因此每块使用增量模式的显示板有自己的编码器。每块显示板的帧带有各自递增的序号和发送时间戳，
+下位机回送的确认汇总在 Display.link 中（见 link.py）。
+
+流控：下位机在确认和定期的 credit 事件中授信（还可以发送多少帧）。收到过授信的显示板
+只在有授信时发送，授信用完时跳过的采样不会排队，下一次发送的就是最新数据（增量编码也只对实际发送的帧进行），
+吞吐因此自动降到下位机实际能刷新的速度。长时间没有新授信时每隔 CREDIT_TIMEOUT 发送一帧探测。
+
+回填：FanOut保留最近 HISTORY_SIZE 次采样，下位机启动（或重启后收到第一帧）时发送
+{"type": "backfill", "count": N} 请求，上位机以批量帧一次发送最近N次采样，趋势图无需等待数分钟才填满。
+
+显示板用 URL#选项 描述，选项写在URL的片段部分，例如:
+    COM31#format=binary&delta=1&interval=2
+    tcp://10.0.0.5:9000#format=json
+"""
+import collections
+import time
+import urllib.parse
+
+import frame_codec
+from frame_writer import FrameWriter
+from link import LinkStats
+from transport import open_transport
+
+# 采样时刻有少量抖动，判断发送间隔时留出的容差（秒）
+INTERVAL_SLACK = 0.05
+
+# 授信用完后多久没有收到新授信就发送一帧探测（秒）
+CREDIT_TIMEOUT = 5.0
+
+# 为回填保留的最近采样数
+HISTORY_SIZE = 120
+
+
+def parse_display_url(url, defaults):
+    """拆分 URL#选项，返回 (传输URL, 选项字典)；未指定的选项取defaults"""
+    base, _, fragment = url.partition('#')
+    options = dict(defaults)
+    for key, value in urllib.parse.parse_qsl(fragment):
+        if key == 'format':
+            options['format'] = value
+        elif key == 'delta':
+            options['delta'] = value not in ('0', 'false', 'no')
+        elif key == 'interval':
+            options['interval'] = float(value)
+        else:
+            raise ValueError(f"unknown display option: {key}")
+    return base, options
+
+
+class Display:
+    """单块显示板：传输 + 写线程 + 发送间隔 + 编码方式"""
+
+    def __init__(self, name, port, fmt='json', delta=False, interval=0.0,
+                 keyframe_interval=12, queue_size=8):
+        self.name = name
+        self.port = port
+        self.fmt = fmt
+        self.interval = interval    # 最小发送间隔（秒），0表示每次采样都发送
+        self.encoder = frame_codec.DeltaEncoder(fmt, keyframe_interval) if delta else None
+        self.keyframe_interval = keyframe_interval
+        self.since_keyframe = None  # 非增量模式下距上一次带time的帧的帧数，None表示下一帧必须带time
+        self.writer = FrameWriter(port, queue_size, on_drop=self.reset)
+        self.last_send = None
+        self.seq = 0                # 下一帧的序号
+        self.link = LinkStats()
+        self.credit_limit = None    # 第一个不允许发送的序号，None表示下位机未启用流控
+        self.credit_time = 0.0      # 最近一次收到授信（或发送探测帧）的时刻
+        self.sent = 0
+        self.skipped = 0            # 因发送间隔未到而跳过的采样
+        self.throttled = 0          # 因没有授信而跳过的采样
+        self.backfills = 0
+
+    def reset(self):
+        """下一帧发送完整关键帧（写队列丢帧后，或下位机启动时请求回填、请求关键帧时）"""
+        self.since_keyframe = None
+        if self.encoder is not None:
+            self.encoder.reset()
+
+    def next_keyframe(self):
+        """非增量模式：本帧是否带time，每keyframe_interval帧一次"""
+        if self.since_keyframe is None or self.since_keyframe >= self.keyframe_interval:
+            self.since_keyframe = 0
+            return True
+        self.since_keyframe += 1
+        return False
+
+    def due(self, now):
+        """是否到了下一次发送时间"""
+        return self.last_send is None or now - self.last_send >= self.interval - INTERVAL_SLACK
+
+    def grant(self, seq, credit, now=None):
+        """
+        收到授信：序号seq之后还可以发送credit帧
+        seq为None或负数表示下位机还没有收到过帧，从当前序号算起
+        """
+        if seq is None or seq < 0:
+            self.credit_limit = (self.seq + credit) % frame_codec.SEQ_MODULO
+        else:
+            self.credit_limit = (seq + 1 + credit) % frame_codec.SEQ_MODULO
+        self.credit_time = time.monotonic() if now is None else now
+
+    def on_credit(self, event):
+        """EventReader的 'ack' / 'credit' 事件处理函数"""
+        data = event.data
+        if isinstance(data, dict) and 'credit' in data:
+            try:
+                self.grant(data.get('seq'), int(data['credit']), event.received)
+            except (TypeError, ValueError):
+                pass
+
+    def credits(self):
+        """剩余授信帧数，未启用流控时返回None"""
+        if self.credit_limit is None:
+            return None
+        remaining = (self.credit_limit - self.seq) % frame_codec.SEQ_MODULO
+        # 授信落后于已发送的序号（确认在途）时视为用完
+        return remaining if remaining < frame_codec.SEQ_MODULO // 2 else 0
+
+    def has_credit(self, now):
+        """是否可以发送下一帧"""
+        credits = self.credits()
+        if credits is None or credits > 0:
+            return True
+        if now - self.credit_time >= CREDIT_TIMEOUT:
+            self.credit_time = now
+            return True
+        return False
+
+    def backfill(self, samples):
+        """以批量帧发送历史采样（旧的在前），返回帧数"""
+        frames = frame_codec.encode_batch(samples, self.fmt)
+        for frame in frames:
+            self.writer.send(frame)
+        self.backfills += 1
+        return len(frames)
+
+    def status(self):
+        """积压统计，用于判断哪块显示板跟不上"""
+        writer = self.writer
+        credits = self.credits()
+        flow = "" if credits is None else f" credit={credits} throttled={self.throttled}"
+        return (f"{self.name}: sent={self.sent} dropped={writer.dropped} "
+                f"pending={writer.pending()} lag={writer.lag():.2f}s "
+                f"max_latency={writer.max_latency:.2f}s{flow} {self.link.status()}")
+
+    def close(self):
+        self.writer.close()
+        self.port.close()
+
+
+class FanOut:
+    """把每次采样分发到所有显示板"""
+
+    def __init__(self, displays, history_size=HISTORY_SIZE):
+        self.displays = displays
+        self.samples = 0
+        self.history = collections.deque(maxlen=history_size)
+
+    @classmethod
+    def open(cls, urls, defaults, baud_rate, keyframe_interval=12, queue_size=8):
+        """按 URL#选项 列表打开所有显示板"""
+        displays = []
+        try:
+            for url in urls:
+                base, options = parse_display_url(url, defaults)
+                port = open_transport(base, baud_rate)
+                name = getattr(port, 'name', None) or base
+                print(f"Opened {name} successfully.")
+                displays.append(Display(name, port, options['format'], options['delta'],
+                                        options['interval'], keyframe_interval, queue_size))
+        except Exception:
+            for display in displays:
+                display.close()
+            raise
+        return cls(displays)
+
+    def publish(self, data):
+        """发送一次采样，返回本次写入队列的总字节数"""
+        self.samples += 1
+        self.history.append(data)
+        now = time.monotonic()
+        ts = frame_codec.timestamp_ms(now)
+        shared = {}
+        total = 0
+        for display in self.displays:
+            if not display.due(now):
+                display.skipped += 1
+                continue
+            if not display.has_credit(now):
+                display.throttled += 1
+                continue
+            if display.encoder is not None:
+                frame = display.encoder.encode(data)
+            else:
+                key = (display.fmt, display.next_keyframe())
+                frame = shared.get(key)
+                if frame is None:
+                    frame = shared[key] = frame_codec.encode(data, *key)
+            frame = frame_codec.stamp(frame, display.seq, ts)
+            display.seq = (display.seq + 1) % frame_codec.SEQ_MODULO
+            display.writer.send(frame)
+            display.last_send = now
+            display.sent += 1
+            total += len(frame)
+        return total
+
+    def backfill(self, display, count):
+        """向一块显示板回填最近count次采样，返回 (样本数, 帧数)"""
+        # 写队列满时会丢弃最旧的帧，因此一次回填的帧数不超过队列长度
+        per_frame = frame_codec.BATCH_MAX_SAMPLES if display.fmt == 'binary' else frame_codec.BATCH_JSON_SAMPLES
+        count = min(count, len(self.history), display.writer.queue.maxlen * per_frame)
+        if count <= 0:
+            return 0, 0
+        samples = list(self.history)[-count:]
+        return count, display.backfill(samples)
+
+    def status(self):
+        return "; ".join(display.status() for display in self.displays)
+
+    def close(self):
+        for display in self.displays:
+            display.close()
@@ -0,0 +1,337 @@
+"""
+遥测帧编码 - 紧凑二进制帧格式（与JSON行协议并存，按需启用）
+
+帧结构（小端）:
+    头部: magic(1) version(1) type(1) length(2)
+    负载: 由帧类型决定的定长整数字段，length为负载字节数
+
+完整帧负载:
+    time(uint32)      本地时间，按UTC换算的秒数
+    cpu(uint16)       CPU利用率 ×10
+    memory(uint16)    内存利用率 ×10
+    processes(uint32) 进程数
+    net_sent(uint32)  上传速率 B/s
+    net_recv(uint32)  下载速率 B/s
+
+增量帧负载:
+    mask(uint8)       第i位为1表示第i个字段（顺序同完整帧）出现在后面
+    变化的字段，按完整帧中的类型依次打包
+
+JSON行协议下的增量帧只包含变化的键，并带有 "d": 1 标记。
+JSON行中的time与二进制帧相同，是整数秒。增量帧不携带time，下位机用自己的时钟走时，
+每个完整关键帧中的time用于校正（见 LowerMachine/clock.py）。不使用增量模式时，
+JSON完整帧同样只在每 keyframe_interval 帧中带一次time（见 encode 的 keyframe 参数）。
+
+批量帧（FRAME_TYPE_BATCH，历史回填，见 encode_batch）:
+    flags(uint8)      第0位为1表示这是一次回填的第一帧，下位机应先清空已有历史
+    count(uint8)      样本数
+    count个样本，每个为 cpu(uint16) memory(uint16) net_sent(uint32) net_recv(uint32)，旧的在前
+JSON行: {"b": [[cpu, memory, net_sent, net_recv], ...], "r": 1}，数值为线上整数（cpu/memory ×10），r只出现在第一行
+
+带序号的帧（见 stamp）:
+    二进制帧的type最高位（FRAME_FLAG_STAMPED）置1，负载前多出 seq(uint16) ts(uint32)
+    JSON行多出 "seq" 和 "ts" 两个键
+    seq为每块显示板各自递增的序号（模65536），ts为发送时刻单调时钟毫秒数的低30位，
+    下位机据此统计丢帧和乱序，并在界面刷新后回送确认 {"type": "ack", "seq", "ts", "hold"}
+
+下位机对应的解码器见 LowerMachine/frame_codec.py，两边的常量必须保持一致。
+"""
+import calendar
+import json
+import struct
+import time
+
+FRAME_MAGIC = 0xA5
+FRAME_VERSION = 1
+
+FRAME_TYPE_FULL = 0x01
+FRAME_TYPE_DELTA = 0x02
+FRAME_TYPE_BATCH = 0x03
+
+# type的最高位，表示负载前带有序号和发送时间戳
+FRAME_FLAG_STAMPED = 0x80
+
+HEADER_FORMAT = '<BBBH'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+FULL_FORMAT = '<IHHIII'
+FULL_SIZE = struct.calcsize(FULL_FORMAT)
+
+STAMP_FORMAT = '<HI'
+STAMP_SIZE = struct.calcsize(STAMP_FORMAT)
+
+SEQ_MODULO = 0x10000
+# 时间戳只保留30位，在下位机上始终是小整数，不产生堆分配（约12天回绕一次）
+TIMESTAMP_MASK = 0x3FFFFFFF
+
+# 字段顺序与完整帧负载一致
+FIELDS = ('time', 'cpu', 'memory', 'processes', 'net_sent', 'net_recv')
+FIELD_FORMATS = ('I', 'H', 'H', 'I', 'I', 'I')
+
+# 批量帧只携带趋势图用到的字段
+BATCH_FIELDS = ('cpu', 'memory', 'net_sent', 'net_recv')
+BATCH_SAMPLE_FORMAT = '<HHII'
+BATCH_SAMPLE_SIZE = struct.calcsize(BATCH_SAMPLE_FORMAT)
+BATCH_FLAG_FIRST = 0x01
+# 每帧的样本数：二进制负载不超过下位机的 MAX_PAYLOAD(256)，JSON行不超过下位机的接收缓冲区(512)
+BATCH_MAX_SAMPLES = 20
+BATCH_JSON_SAMPLES = 10
+
+UINT16_MAX = 0xFFFF
+UINT32_MAX = 0xFFFFFFFF
+
+
+def wall_seconds(dt):
+    """将本地datetime转换为整数秒（按UTC换算，下位机无需时区信息即可还原）"""
+    return calendar.timegm(dt.timetuple())
+
+
+def format_time(ts):
+    """将wall_seconds()得到的整数秒格式化为 'YYYY-MM-DD HH:MM:SS'"""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts))
+
+
+def timestamp_ms(now=None):
+    """单调时钟毫秒数的低30位，now为time.monotonic()的值"""
+    return int((time.monotonic() if now is None else now) * 1000) & TIMESTAMP_MASK
+
+
+def _clamp(value, upper):
+    """限制到无符号整数范围内"""
+    value = int(value)
+    if value < 0:
+        return 0
+    if value > upper:
+        return upper
+    return value
+
+
+def encode_header(frame_type, length):
+    """打包帧头"""
+    return struct.pack(HEADER_FORMAT, FRAME_MAGIC, FRAME_VERSION, frame_type, length)
+
+
+def quantize(data):
+    """将一次采样转换为线上使用的整数字段元组，data['time']为wall_seconds()得到的整数"""
+    return (
+        _clamp(data['time'], UINT32_MAX),
+        _clamp(round(data['cpu'] * 10), UINT16_MAX),
+        _clamp(round(data['memory'] * 10), UINT16_MAX),
+        _clamp(data['processes'], UINT32_MAX),
+        _clamp(data['net_sent'], UINT32_MAX),
+        _clamp(data['net_recv'], UINT32_MAX),
+    )
+
+
+def _pack_full(values):
+    """打包quantize()得到的字段元组为完整帧"""
+    return encode_header(FRAME_TYPE_FULL, FULL_SIZE) + struct.pack(FULL_FORMAT, *values)
+
+
+def encode_full(data):
+    """将一次采样编码为完整二进制帧"""
+    return _pack_full(quantize(data))
+
+
+def encode_delta(values, previous):
+    """只打包与previous相比发生变化的字段，values/previous均为quantize()的结果"""
+    mask = 0
+    fmt = '<B'
+    changed = []
+    for i, value in enumerate(values):
+        if value != previous[i]:
+            mask |= 1 << i
+            fmt += FIELD_FORMATS[i]
+            changed.append(value)
+    payload = struct.pack(fmt, mask, *changed)
+    return encode_header(FRAME_TYPE_DELTA, len(payload)) + payload
+
+
+def json_message(data, with_time=True):
+    """
+    将一次采样转换为JSON协议使用的字典（只保留协议字段，time为整数秒；with_time为False时不带time）
+    数值经过quantize()，与二进制帧一样限制在线上整数范围内（如网络速率不会为负）
+    """
+    msg = dequantize(quantize(data))
+    if not with_time:
+        del msg['time']
+    return msg
+
+
+def encode_json(msg):
+    """编码为一行JSON"""
+    return (json.dumps(msg) + '\n').encode('utf-8')
+
+
+def encode(data, fmt='json', keyframe=True):
+    """
+    将一次采样编码为完整帧（JSON行或二进制帧）
+    keyframe为False时JSON行不带time（下位机自己走时）；二进制完整帧为定长，总是带time
+    """
+    if fmt == 'binary':
+        return encode_full(data)
+    return encode_json(json_message(data, keyframe))
+
+
+def encode_batch(samples, fmt='json'):
+    """把多次采样（旧的在前）编码为一组批量帧，返回字节串列表"""
+    per_frame = BATCH_MAX_SAMPLES if fmt == 'binary' else BATCH_JSON_SAMPLES
+    frames = []
+    for start in range(0, len(samples), per_frame):
+        rows = [quantize(data) for data in samples[start:start + per_frame]]
+        rows = [(v[1], v[2], v[4], v[5]) for v in rows]
+        if fmt == 'binary':
+            flags = BATCH_FLAG_FIRST if start == 0 else 0
+            payload = struct.pack('<BB', flags, len(rows)) + b''.join(
+                struct.pack(BATCH_SAMPLE_FORMAT, *row) for row in rows)
+            frames.append(encode_header(FRAME_TYPE_BATCH, len(payload)) + payload)
+        else:
+            msg = {'b': [list(row) for row in rows]}
+            if start == 0:
+                msg['r'] = 1
+            frames.append(encode_json(msg))
+    return frames
+
+
+def stamp(frame, seq, ts):
+    """给编码好的帧（二进制帧或JSON行）加上序号和发送时间戳"""
+    if frame[0] == FRAME_MAGIC:
+        frame_type, length = decode_header(frame)
+        return (encode_header(frame_type | FRAME_FLAG_STAMPED, length + STAMP_SIZE)
+                + struct.pack(STAMP_FORMAT, seq, ts) + frame[HEADER_SIZE:])
+    # JSON行一定是非空对象，在结尾的 } 之前插入两个键
+    return frame.rstrip()[:-1] + b', "seq": %d, "ts": %d}\n' % (seq, ts)
+
+
+class DeltaEncoder:
+    """增量编码器：记住上一次发送的帧，只发送变化的字段，并定期发送完整关键帧"""
+
+    def __init__(self, fmt='json', keyframe_interval=12):
+        self.fmt = fmt
+        self.keyframe_interval = keyframe_interval
+        self.last = None
+        self.frames_since_keyframe = 0
+
+    def reset(self):
+        """下一帧强制发送关键帧（如下位机重启后）"""
+        self.last = None
+
+    def encode(self, data):
+        """编码一次采样，返回待发送的字节串"""
+        if self.fmt == 'binary':
+            current = quantize(data)
+        else:
+            current = json_message(data)
+
+        keyframe = (self.last is None or
+                    self.frames_since_keyframe >= self.keyframe_interval)
+        if keyframe:
+            self.frames_since_keyframe = 0
+        else:
+            self.frames_since_keyframe += 1
+
+        # 增量帧不携带time（下位机自己走时），只在关键帧中校正
+        if self.fmt == 'binary':
+            if keyframe:
+                frame = _pack_full(current)
+            else:
+                frame = encode_delta(current, (current[0],) + self.last[1:])
+        else:
+            if keyframe:
+                frame = encode_json(current)
+            else:
+                changed = {key: value for key, value in current.items()
+                           if key != 'time' and self.last.get(key) != value}
+                changed['d'] = 1
+                frame = encode_json(changed)
+
+        self.last = current
+        return frame
+
+
+def decode_header(buf):
+    """解析帧头，返回 (frame_type, length)，格式不符时抛出ValueError"""
+    magic, version, frame_type, length = struct.unpack_from(HEADER_FORMAT, buf)
+    if magic != FRAME_MAGIC:
+        raise ValueError(f"bad frame magic: 0x{magic:02x}")
+    if version != FRAME_VERSION:
+        raise ValueError(f"unsupported frame version: {version}")
+    return frame_type, length
+
+
+def _scale(index, value):
+    """将线上整数还原为采样值"""
+    if FIELDS[index] in ('cpu', 'memory'):
+        return value / 10
+    return value
+
+
+def dequantize(values):
+    """quantize()的逆过程，返回与JSON协议同名字段的字典（time保持为整数秒）"""
+    return {key: _scale(i, values[i]) for i, key in enumerate(FIELDS)}
+
+
+def decode_full(payload):
+    """解析完整帧负载"""
+    return dequantize(struct.unpack_from(FULL_FORMAT, payload))
+
+
+def decode_delta(payload, data):
+    """将增量帧负载合并进data"""
+    mask = payload[0]
+    offset = 1
+    for i, key in enumerate(FIELDS):
+        if mask & (1 << i):
+            fmt = '<' + FIELD_FORMATS[i]
+            data[key] = _scale(i, struct.unpack_from(fmt, payload, offset)[0])
+            offset += struct.calcsize(fmt)
+    return data
+
+
+def read_message(port):
+    """
+    从传输读取一条消息（二进制帧或JSON行），返回字段字典；超时或无法识别返回None
+    增量帧只包含变化的字段，并带有 'd' 键；批量帧返回 {'b': 样本列表}，第一帧带有 'r' 键
+    """
+    first = port.read(1)
+    if not first:
+        return None
+
+    if first[0] != FRAME_MAGIC:
+        line = (first + port.readline()).strip()
+        if not line:
+            return None
+        return json.loads(line)
+
+    header = first + port.read(HEADER_SIZE - 1)
+    if len(header) < HEADER_SIZE:
+        return None
+    frame_type, length = decode_header(header)
+    payload = port.read(length)
+    if len(payload) < length:
+        return None
+
+    stamped = {}
+    if frame_type & FRAME_FLAG_STAMPED:
+        if length < STAMP_SIZE:
+            return None
+        seq, ts = struct.unpack_from(STAMP_FORMAT, payload)
+        stamped = {'seq': seq, 'ts': ts}
+        payload = payload[STAMP_SIZE:]
+        frame_type &= ~FRAME_FLAG_STAMPED
+
+    if frame_type == FRAME_TYPE_FULL:
+        msg = decode_full(payload)
+    elif frame_type == FRAME_TYPE_DELTA:
+        msg = decode_delta(payload, {})
+        msg['d'] = 1
+    elif frame_type == FRAME_TYPE_BATCH:
+        flags, count = struct.unpack_from('<BB', payload)
+        msg = {'b': [list(struct.unpack_from(BATCH_SAMPLE_FORMAT, payload, 2 + i * BATCH_SAMPLE_SIZE))
+                     for i in range(count)]}
+        if flags & BATCH_FLAG_FIRST:
+            msg['r'] = 1
+    else:
+        return None
+    msg.update(stamped)
+    return msg
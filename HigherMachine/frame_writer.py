@@ -0,0 +1,96 @@
+"""
+非阻塞帧发送器
+
+采样循环只把编码好的帧放入有界队列，由独立的写线程负责写串口。下位机停止读取导致写操作阻塞时，
+采样节奏不受影响；队列满时丢弃最旧的帧并计数。写线程一次取出所有等待的帧，合并为一次write调用。
+每帧记录入队时间，用于计算积压时长（lag）和写出延迟。
+"""
+import collections
+import threading
+import time
+
+
+class FrameWriter:
+    """带有界队列的后台写线程"""
+
+    def __init__(self, port, max_frames=8, on_drop=None):
+        self.port = port
+        self.queue = collections.deque(maxlen=max_frames)
+        self.cond = threading.Condition()
+        self.on_drop = on_drop      # 丢帧时回调（如让增量编码器下一帧发送关键帧）
+        self.running = True
+        self.inflight = None        # 正在写出的一批帧中最旧一帧的入队时间
+
+        # 统计
+        self.queued = 0
+        self.dropped = 0
+        self.written = 0            # 已写出的帧数
+        self.writes = 0             # write调用次数
+        self.bytes_written = 0
+        self.errors = 0
+        self.last_latency = 0.0     # 最近一次写出时，最旧一帧从入队到写完的时长
+        self.max_latency = 0.0
+
+        self.thread = threading.Thread(target=self._run, name="frame-writer", daemon=True)
+        self.thread.start()
+
+    def send(self, frame):
+        """放入一帧，立即返回；队列已满时丢弃最旧的帧"""
+        with self.cond:
+            dropped = len(self.queue) == self.queue.maxlen
+            if dropped:
+                self.dropped += 1
+            self.queue.append((time.monotonic(), frame))
+            self.queued += 1
+            self.cond.notify()
+        if dropped and self.on_drop:
+            self.on_drop()
+
+    def pending(self):
+        """队列中等待发送的帧数"""
+        with self.cond:
+            return len(self.queue)
+
+    def lag(self):
+        """尚未写完的最旧一帧已等待的秒数（包括正在阻塞写出的帧），没有积压时为0"""
+        with self.cond:
+            if self.inflight is not None:
+                oldest = self.inflight
+            elif self.queue:
+                oldest = self.queue[0][0]
+            else:
+                return 0.0
+        return time.monotonic() - oldest
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running and not self.queue:
+                    self.cond.wait()
+                if not self.queue:
+                    return
+                oldest = self.inflight = self.queue[0][0]
+                frames = [frame for _, frame in self.queue]
+                self.queue.clear()
+
+            data = b''.join(frames)
+            try:
+                self.port.write(data)
+            except Exception as e:
+                self.errors += 1
+                print(f"Write failed: {e}")
+                continue
+            finally:
+                self.inflight = None
+            self.last_latency = time.monotonic() - oldest
+            self.max_latency = max(self.max_latency, self.last_latency)
+            self.written += len(frames)
+            self.writes += 1
+            self.bytes_written += len(data)
+
+    def close(self, timeout=1.0):
+        """停止写线程，尽量写完队列中剩余的帧"""
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join(timeout)
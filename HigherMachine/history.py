@@ -0,0 +1,256 @@
+"""
+采样历史库 - 把每次采样追加到本地SQLite文件，供长时间趋势、回填和事后排查使用
+
+写入：采样循环只把记录放入内存队列，由独立的写线程每隔 flush_interval 秒（或积攒到 batch_size 条）
+在一个事务中批量写入，磁盘较慢时也不影响发送节奏；队列超过 max_pending 条时丢弃最旧的记录并计数。
+保留：写线程每隔 PRUNE_INTERVAL 秒删除早于 retention 秒的记录，并以 incremental_vacuum 归还空闲页，
+文件大小随保留时长封顶，不需要手动整理。
+查询：query_range 返回时间范围内的原始采样，query_downsampled 按固定步长分桶取平均，
+查询使用独立的只读连接（WAL模式下与写线程互不阻塞），只包含已写入文件的记录；
+命令行查询只读打开文件，不会清理过期记录。
+
+表结构:
+    samples(ts REAL, time, cpu, memory, processes, net_sent, net_recv)
+    ts为写入时的time.time()，其余为 frame_codec.quantize() 得到的整数字段
+
+用法:
+    python system_monitor.py COM31 --history monitor.db
+    python history.py monitor.db --last 3600 --step 60
+"""
+import argparse
+import collections
+import sqlite3
+import sys
+import threading
+import time
+
+import frame_codec
+
+# 默认保留时长（秒）
+DEFAULT_RETENTION = 7 * 86400
+
+# 每次写入的最多记录数与最长间隔（秒）
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+# 写线程跟不上时队列中最多保留的记录数
+DEFAULT_MAX_PENDING = 10000
+
+# 清理过期记录的间隔（秒）
+PRUNE_INTERVAL = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    ts REAL NOT NULL,
+    time INTEGER NOT NULL,
+    cpu INTEGER NOT NULL,
+    memory INTEGER NOT NULL,
+    processes INTEGER NOT NULL,
+    net_sent INTEGER NOT NULL,
+    net_recv INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+"""
+
+INSERT = "INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+COLUMNS = ', '.join(frame_codec.FIELDS)
+
+
+def _connect(path):
+    """
+    打开写连接。auto_vacuum 必须在切换到WAL和建表之前设置才会对新文件生效；
+    旧版本建立的文件（auto_vacuum=0）需要一次VACUUM才能改为增量回收
+    """
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("VACUUM")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _connect_readonly(path):
+    """只读连接，不建表、不写入"""
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+
+def query_range(conn, start, end=None):
+    """时间范围 [start, end) 内的采样，按时间顺序返回 (ts, data) 列表"""
+    rows = conn.execute(f"SELECT ts, {COLUMNS} FROM samples WHERE ts >= ? AND ts < ? ORDER BY ts",
+                        (start, time.time() + 1 if end is None else end)).fetchall()
+    return [(row[0], frame_codec.dequantize(row[1:])) for row in rows]
+
+
+def query_downsampled(conn, start, end=None, step=60.0):
+    """
+    把时间范围 [start, end) 按step秒分桶，返回每个非空桶的 (桶起点, data) 列表
+    data中各字段取桶内平均，time取桶内最后一次采样
+    """
+    rows = conn.execute(
+        "SELECT CAST((ts - ?) / ? AS INTEGER) AS bucket, MAX(time), AVG(cpu), AVG(memory), "
+        "AVG(processes), AVG(net_sent), AVG(net_recv) FROM samples "
+        "WHERE ts >= ? AND ts < ? GROUP BY bucket ORDER BY bucket",
+        (start, step, start, time.time() + 1 if end is None else end)).fetchall()
+    return [(start + row[0] * step, frame_codec.dequantize([round(v) for v in row[1:]]))
+            for row in rows]
+
+
+def query_last(conn, count):
+    """最近count次采样，旧的在前"""
+    rows = conn.execute(f"SELECT ts, {COLUMNS} FROM samples ORDER BY ts DESC LIMIT ?", (count,)).fetchall()
+    return [(row[0], frame_codec.dequantize(row[1:])) for row in reversed(rows)]
+
+
+class HistoryStore:
+    """只追加的采样历史库"""
+
+    def __init__(self, path, retention=DEFAULT_RETENTION, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, max_pending=DEFAULT_MAX_PENDING):
+        self.path = path
+        self.retention = retention
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        conn = _connect(path)
+        conn.executescript(SCHEMA)
+        conn.commit()
+        self.conn = conn                      # 只由写线程使用
+        self.reader = _connect_readonly(path)  # 查询用
+        self.read_lock = threading.Lock()
+
+        self.queue = collections.deque(maxlen=max_pending)
+        self.cond = threading.Condition()
+        self.running = True
+        self.last_prune = 0.0
+
+        # 统计
+        self.appended = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.pruned = 0
+        self.errors = 0
+
+        self.thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self.thread.start()
+
+    def append(self, data, timestamp=None):
+        """追加一次采样（data为collect_sample()的结果），立即返回"""
+        row = (time.time() if timestamp is None else timestamp,) + frame_codec.quantize(data)
+        with self.cond:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+            self.queue.append(row)
+            self.appended += 1
+            if len(self.queue) >= self.batch_size:
+                self.cond.notify()
+
+    def pending(self):
+        """等待写入的记录数"""
+        with self.cond:
+            return len(self.queue)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                if self.running and len(self.queue) < self.batch_size:
+                    self.cond.wait(self.flush_interval)
+                rows = list(self.queue)
+                self.queue.clear()
+                running = self.running
+            if rows:
+                self._write(rows)
+            now = time.time()
+            if now - self.last_prune >= PRUNE_INTERVAL:
+                self.last_prune = now
+                self._prune(now)
+            if not running:
+                return
+
+    def _write(self, rows):
+        try:
+            with self.conn:
+                self.conn.executemany(INSERT, rows)
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"History write failed: {e}")
+            return
+        self.written += len(rows)
+        self.flushes += 1
+
+    def _prune(self, now):
+        """删除过期记录并归还空闲页"""
+        try:
+            with self.conn:
+                deleted = self.conn.execute("DELETE FROM samples WHERE ts < ?", (now - self.retention,)).rowcount
+            if deleted > 0:
+                # execute只执行一步（只释放一页），executescript执行到底
+                self.conn.executescript("PRAGMA incremental_vacuum;")
+                self.pruned += deleted
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"History prune failed: {e}")
+
+    def query_range(self, start, end=None):
+        """时间范围 [start, end) 内的采样，见模块级 query_range"""
+        with self.read_lock:
+            return query_range(self.reader, start, end)
+
+    def query_downsampled(self, start, end=None, step=60.0):
+        """按step秒分桶取平均，见模块级 query_downsampled"""
+        with self.read_lock:
+            return query_downsampled(self.reader, start, end, step)
+
+    def last(self, count):
+        """最近count次采样，旧的在前"""
+        with self.read_lock:
+            return query_last(self.reader, count)
+
+    def status(self):
+        return (f"history appended={self.appended} written={self.written} pending={self.pending()} "
+                f"dropped={self.dropped} pruned={self.pruned} errors={self.errors}")
+
+    def close(self, timeout=5.0):
+        """停止写线程，写完队列中剩余的记录"""
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join(timeout)
+        if not self.thread.is_alive():
+            self.conn.close()
+        self.reader.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="查询采样历史库")
+    parser.add_argument('path', help="历史库文件")
+    parser.add_argument('--last', type=float, default=3600, help="查询最近多少秒")
+    parser.add_argument('--step', type=float, default=0, help="分桶步长（秒），0表示输出原始采样")
+    args = parser.parse_args(argv)
+
+    # 只读打开：查询不启动写线程，也不会触发过期清理
+    try:
+        conn = _connect_readonly(args.path)
+    except sqlite3.Error as e:
+        print(f"Failed to open {args.path}: {e}")
+        return 1
+    try:
+        start = time.time() - args.last
+        if args.step > 0:
+            rows = query_downsampled(conn, start, step=args.step)
+        else:
+            rows = query_range(conn, start)
+        for ts, data in rows:
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts))} "
+                  f"cpu={data['cpu']:.1f}% memory={data['memory']:.1f}% processes={data['processes']} "
+                  f"net_sent={data['net_sent']} net_recv={data['net_recv']}")
+        print(f"{len(rows)} rows")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+链路统计 - 根据下位机回送的确认计算延迟分位数
+
+上位机给每帧加上序号和发送时间戳（frame_codec.stamp），下位机在界面按该帧刷新后回送:
+    {"type": "ack", "seq": 12, "ts": 345678, "hold": 15}
+ts原样带回，hold为下位机从收到该帧到刷新界面的毫秒数。收到确认时:
+    往返延迟 = 当前时刻 - ts - hold       （链路来回各一次，不含下位机排队等待刷新的时间）
+    显示延迟 = 往返延迟 / 2 + hold         （假设上下行对称，估计帧从发出到显示在屏幕上的时间）
+
+下位机还会定期上报计数:
+    {"type": "stats", "received": ..., "lost": ..., "reorders": ..., "duplicates": ..., "acks": ..., "coalesced": ...,
+     "applied": ..., "skipped": ..., "frame_applied": ..., "frame_skipped": ...}
+applied/skipped为下位机界面标签实际重绘与因内容未变而跳过的累计次数，frame_applied/frame_skipped为最近一帧中的次数。
+以及刷新调度的计数（见 LowerMachine/render_scheduler.py）:
+    {"type": "render", "frames": ..., "skipped": ..., "late": ..., "frame_ms": ..., "latency_ms": ..., ...}
+"""
+import collections
+
+import frame_codec
+
+# 计算分位数使用的最近样本数
+DEFAULT_WINDOW = 256
+
+
+class Percentiles:
+    """最近window个样本的分位数（毫秒）"""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.samples = collections.deque(maxlen=window)
+
+    def add(self, value):
+        self.samples.append(value)
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def __str__(self):
+        return (f"p50={self.percentile(50):.0f}ms p90={self.percentile(90):.0f}ms "
+                f"p99={self.percentile(99):.0f}ms")
+
+
+class LinkStats:
+    """一块显示板的链路统计"""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.acks = 0
+        self.bad_acks = 0
+        self.last_ack_seq = None
+        self.rtt = Percentiles(window)
+        self.display = Percentiles(window)
+        self.device = {}            # 下位机最近一次上报的计数
+        self.render = {}            # 下位机最近一次上报的刷新计数
+
+    def on_ack(self, event):
+        """EventReader的 'ack' 事件处理函数"""
+        data = event.data
+        try:
+            sent = int(data['ts'])
+            hold = int(data.get('hold', 0))
+            seq = int(data['seq'])
+        except (KeyError, TypeError, ValueError):
+            self.bad_acks += 1
+            return
+        age = (frame_codec.timestamp_ms(event.received) - sent) & frame_codec.TIMESTAMP_MASK
+        rtt = max(0, age - hold)
+        self.acks += 1
+        self.last_ack_seq = seq
+        self.rtt.add(rtt)
+        self.display.add(rtt / 2 + hold)
+
+    def on_stats(self, event):
+        """EventReader的 'stats' 事件处理函数"""
+        self.device = {key: value for key, value in event.data.items() if key != 'type'}
+
+    def on_render(self, event):
+        """EventReader的 'render' 事件处理函数"""
+        self.render = {key: value for key, value in event.data.items() if key != 'type'}
+
+    def status(self):
+        parts = [f"acks={self.acks}"]
+        if self.acks:
+            parts.append(f"rtt {self.rtt}")
+            parts.append(f"display {self.display}")
+        if self.device:
+            parts.append("device " + " ".join(f"{key}={value}" for key, value in self.device.items()))
+        if self.render:
+            parts.append("render " + " ".join(f"{key}={value}" for key, value in self.render.items()))
+        return " ".join(parts)
@@ -0,0 +1,164 @@
+"""
+遥测录制与回放
+
+录制：每次采样追加一条定长记录到内存映射的环形文件，文件大小固定，写满后覆盖最旧的记录。
+回放：按录制时的时间间隔把记录重新编码成帧，通过任意传输发送，可1倍速、N倍速或不限速，
+为下位机界面提供可复现的输入，并可用于压测 MonitorPage.update / TrendPage.update。
+
+文件结构（小端）:
+    头部: magic(4) version(2) record_size(2) capacity(4) count(8)
+          count为累计写入的记录数，最新记录位于 (count - 1) % capacity
+    记录: timestamp(float64，time.time()) + 完整帧负载的各字段（见 frame_codec.FULL_FORMAT）
+
+用法:
+    python system_monitor.py COM31 --record monitor.rec
+    python recording.py monitor.rec pty:// --speed 10
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+
+import frame_codec
+from transport import open_transport
+
+RECORDING_MAGIC = b'PLRC'
+RECORDING_VERSION = 1
+
+HEADER_FORMAT = '<4sHHIQ'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+COUNT_OFFSET = HEADER_SIZE - 8
+
+RECORD_FORMAT = '<d' + frame_codec.FULL_FORMAT[1:]
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+DEFAULT_CAPACITY = 86400
+
+
+class Recorder:
+    """追加写入环形录制文件"""
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        size = HEADER_SIZE + capacity * RECORD_SIZE
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            existing = os.fstat(fd).st_size
+            if existing == 0:
+                os.ftruncate(fd, size)
+            self.mm = mmap.mmap(fd, 0)
+        finally:
+            os.close(fd)
+
+        if existing == 0:
+            struct.pack_into(HEADER_FORMAT, self.mm, 0, RECORDING_MAGIC, RECORDING_VERSION,
+                             RECORD_SIZE, capacity, 0)
+        self.capacity, self.count = _read_header(self.mm)
+
+    def append(self, data, timestamp=None):
+        """追加一次采样（data为collect_sample()的结果）"""
+        index = self.count % self.capacity
+        struct.pack_into(RECORD_FORMAT, self.mm, HEADER_SIZE + index * RECORD_SIZE,
+                         time.time() if timestamp is None else timestamp,
+                         *frame_codec.quantize(data))
+        self.count += 1
+        struct.pack_into('<Q', self.mm, COUNT_OFFSET, self.count)
+
+    def close(self):
+        self.mm.flush()
+        self.mm.close()
+
+
+def _read_header(mm):
+    """校验头部，返回 (capacity, count)"""
+    magic, version, record_size, capacity, count = struct.unpack_from(HEADER_FORMAT, mm, 0)
+    if magic != RECORDING_MAGIC or version != RECORDING_VERSION or record_size != RECORD_SIZE:
+        raise ValueError("not a telemetry recording or unsupported version")
+    return capacity, count
+
+
+class Recording:
+    """只读打开录制文件，按时间顺序遍历记录"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.capacity, self.count = _read_header(self.mm)
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def __iter__(self):
+        """依次产生 (timestamp, data)，data与collect_sample()的字段一致"""
+        first = self.count - len(self)
+        for n in range(first, self.count):
+            offset = HEADER_SIZE + (n % self.capacity) * RECORD_SIZE
+            values = struct.unpack_from(RECORD_FORMAT, self.mm, offset)
+            yield values[0], frame_codec.dequantize(values[1:])
+
+    def close(self):
+        self.mm.close()
+
+
+def replay(recording, port, speed=1.0, fmt='json', delta=False, keyframe_interval=12):
+    """
+    回放录制内容到port
+    speed为回放倍速，0表示不限速；返回 (帧数, 字节数, 耗时)
+    """
+    encoder = frame_codec.DeltaEncoder(fmt, keyframe_interval) if delta else None
+    frames = 0
+    total = 0
+    start = time.monotonic()
+    first_ts = None
+
+    for ts, data in recording:
+        if speed > 0:
+            # 以回放开始时刻为基准计算每条记录的发送时间，不累积误差
+            if first_ts is None:
+                first_ts = ts
+            delay = start + (ts - first_ts) / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        if encoder is not None:
+            frame = encoder.encode(data)
+        else:
+            frame = frame_codec.encode(data, fmt, frames % (keyframe_interval + 1) == 0)
+        port.write(frame_codec.stamp(frame, frames % frame_codec.SEQ_MODULO, frame_codec.timestamp_ms()))
+        frames += 1
+        total += len(frame)
+
+    return frames, total, time.monotonic() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="回放遥测录制文件")
+    parser.add_argument('path', help="录制文件")
+    parser.add_argument('url', help="传输URL，如 COM31、pty://、tcp://host:port")
+    parser.add_argument('--speed', type=float, default=1.0, help="回放倍速，0表示不限速")
+    parser.add_argument('--format', choices=('json', 'binary'), default='json')
+    parser.add_argument('--delta', action='store_true')
+    parser.add_argument('--loop', action='store_true', help="循环回放")
+    args = parser.parse_args(argv)
+
+    recording = Recording(args.path)
+    port = open_transport(args.url)
+    print(f"Replaying {len(recording)} records to {getattr(port, 'name', args.url)}")
+    try:
+        while True:
+            frames, total, elapsed = replay(recording, port, args.speed, args.format, args.delta)
+            rate = frames / elapsed if elapsed > 0 else 0
+            print(f"Replayed {frames} frames, {total} bytes in {elapsed:.2f}s ({rate:.0f} frames/s)")
+            if not args.loop:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        port.close()
+        recording.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
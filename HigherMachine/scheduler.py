@@ -0,0 +1,106 @@
+"""
+自适应采样调度器
+
+内部以较高频率采样，数值变化超过阈值时提高发送频率，系统平稳时逐步退避到最低发送频率。
+所有时间点都基于单调时钟按固定步长推进，不会因采样/发送耗时而累积漂移。
+"""
+import asyncio
+import time
+
+# 默认变化阈值：任一字段与上次发送值的差超过阈值即视为变化
+DEFAULT_THRESHOLDS = {
+    'cpu': 5.0,                  # 百分点
+    'memory': 2.0,               # 百分点
+    'processes': 5,
+    'net_sent': 64 * 1024,       # B/s
+    'net_recv': 64 * 1024,       # B/s
+}
+
+
+class AdaptiveScheduler:
+    """根据数据变化调整发送间隔的调度器"""
+
+    def __init__(self, sample_interval=0.5, min_interval=1.0, max_interval=5.0,
+                 thresholds=None, backoff=1.5, clock=time.monotonic):
+        self.sample_interval = sample_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.thresholds = DEFAULT_THRESHOLDS if thresholds is None else thresholds
+        self.backoff = backoff
+        self.clock = clock
+
+        self.interval = min_interval  # 当前发送间隔
+        self.last_sent = None         # 上次发送的数据
+        self.last_send_time = None
+
+        # 统计
+        self.samples = 0
+        self.sent = 0
+
+    def changed(self, data):
+        """判断data与上次发送的数据相比是否超过阈值"""
+        for key, threshold in self.thresholds.items():
+            if abs(data[key] - self.last_sent[key]) >= threshold:
+                return True
+        return False
+
+    def _due(self, elapsed, interval):
+        """发送只发生在采样时间点上，留出半个采样间隔的容差"""
+        return elapsed >= interval - self.sample_interval / 2
+
+    def should_send(self, data, now):
+        """根据当前数据和时间决定本次采样是否发送，并更新发送间隔"""
+        self.samples += 1
+        if self.last_sent is None:
+            send = True
+        else:
+            elapsed = now - self.last_send_time
+            if self.changed(data):
+                # 数据有明显变化：恢复到最高发送频率
+                self.interval = self.min_interval
+                send = self._due(elapsed, self.min_interval)
+            elif self._due(elapsed, self.interval):
+                # 数据平稳：按退避系数逐步拉长发送间隔
+                self.interval = min(self.max_interval, self.interval * self.backoff)
+                send = True
+            else:
+                send = False
+
+        if send:
+            self.last_sent = data
+            self.last_send_time = now
+            self.sent += 1
+        return send
+
+    def _advance(self, next_tick):
+        """以上一个计划时间点为基准推进，跳过已错过的时间点，返回 (下一个时间点, 需等待的秒数)"""
+        next_tick += self.sample_interval
+        now = self.clock()
+        if next_tick < now:
+            missed = int((now - next_tick) / self.sample_interval) + 1
+            next_tick += missed * self.sample_interval
+        return next_tick, next_tick - now
+
+    def run(self, sample_fn, send_fn, sleep=time.sleep):
+        """调度主循环：按sample_interval采样，需要时调用send_fn(data)"""
+        next_tick = self.clock()
+        while True:
+            data = sample_fn()
+            if self.should_send(data, self.clock()):
+                send_fn(data)
+            next_tick, delay = self._advance(next_tick)
+            sleep(delay)
+
+    async def run_async(self, sample_fn, send_fn):
+        """
+        与run相同，但运行在asyncio事件循环中，可与事件读取器等共享同一个循环
+        sample_fn可能阻塞（等待采集预算），放到线程池中执行
+        """
+        loop = asyncio.get_running_loop()
+        next_tick = self.clock()
+        while True:
+            data = await loop.run_in_executor(None, sample_fn)
+            if self.should_send(data, self.clock()):
+                send_fn(data)
+            next_tick, delay = self._advance(next_tick)
+            await asyncio.sleep(delay)
@@ -1,80 +1,204 @@
-import serial
-import psutil
+import argparse
+import asyncio
 import datetime
-import time
-import json
+import functools
+import sys
 
-# 配置串行通信参数
-com_port = 'COM31'  # 根据实际端口修改
+import frame_codec
+from collectors import CollectorSet, proc_collectors, psutil_collectors
+from event_reader import EventReader
+from fanout import FanOut
+from history import HistoryStore
+from recording import Recorder
+from scheduler import AdaptiveScheduler
+
+# 配置通信参数，可用命令行参数覆盖
+com_port = 'COM31'  # 根据实际端口修改，也可以是 transport.py 支持的任意URL（pty://、tcp://host:port 等）
 baud_rate = 115200
 
-# 打开串行端口
-try:
-    ser = serial.Serial(com_port, baud_rate, timeout=1)
-    print(f"Opened {com_port} successfully.")
-except serial.SerialException as e:
-    print(f"Failed to open {com_port}: {e}")
-    exit(1)
-
-# 初始化网络计数器和CPU监控
-last_net_io = psutil.net_io_counters()
-last_time = time.time()
-# 首次调用CPU监控，初始化基准
-psutil.cpu_percent(interval=None)
-
-def get_system_info():
-    global last_net_io, last_time
-    
-    # 先记录开始时间
-    start_time = time.time()
-    
+# 帧格式：'json' 为JSON行协议，'binary' 为紧凑二进制帧（见 frame_codec.py）
+frame_format = 'json'
+
+# 增量模式：只发送变化的字段，每隔 keyframe_interval 帧发送一次完整关键帧
+delta_mode = False
+keyframe_interval = 12
+
+# 发送间隔（秒），增量模式下链路开销足够小，可设为1秒以内
+send_interval = 5
+
+# 自适应发送：以 sample_interval 采样，数值变化超过阈值时按 min_send_interval 发送，
+# 平稳时逐步退避到 send_interval；关闭时固定每 send_interval 秒发送一次
+adaptive_mode = False
+sample_interval = 0.5
+min_send_interval = 1.0
+
+# 发送队列长度，下位机来不及读取时丢弃最旧的帧
+writer_queue_size = 8
+
+# 采集后端：'psutil' 跨平台；'proc' 仅Linux，直接读取/proc，开销更低
+# （'proc' 的进程数取自/proc/loadavg，统计的是包括线程在内的任务数；
+#  proc_count_processes 为True时改为遍历/proc统计真正的进程数，开销随进程数增长）
+collector_backend = 'psutil'
+proc_count_processes = False
+
+# 各采集项的时间预算（秒），超时的采集项沿用上次的值并标记为stale
+collector_budgets = {
+    'cpu': 0.1,
+    'memory': 0.1,
+    'processes': 0.3,
+    'network': 0.1,
+}
+
+# 录制文件容量（条），写满后覆盖最旧的记录
+record_capacity = 86400
+
+# 历史库保留时长（秒），过期记录自动删除
+history_retention = 7 * 86400
+
+# 运行时对象，由 main() 创建
+collector_set = None
+fanout = None
+recorder = None
+history = None
+
+def collect_sample():
+    """采集一次系统信息，返回原始数据字典（time为整数秒）"""
     # 获取当前时间
-    current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    data = {"time": frame_codec.wall_seconds(datetime.datetime.now())}
+
+    # 并发运行各采集项，耗时不超过最大预算
+    data.update(collector_set.collect())
+    if data["stale"]:
+        print(f"Stale collectors: {', '.join(data['stale'])}")
+
+    if recorder is not None:
+        recorder.append(data)
+    if history is not None:
+        history.append(data)
+
+    return data
 
-    # 获取CPU利用率（非阻塞模式）
-    cpu_percent = psutil.cpu_percent(interval=None)
+def get_system_info(fmt=None):
+    """采集一次系统信息并编码为完整帧（JSON行或二进制帧）"""
+    return frame_codec.encode(collect_sample(), fmt or frame_format)
 
-    # 获取内存利用率
-    memory = psutil.virtual_memory()
-    memory_percent = memory.percent
+def send_sample(data):
+    """把一次采样分发到所有显示板"""
+    total = fanout.publish(data)
+    print(f"Sent ({total} bytes): {frame_codec.json_message(data)}")
+    if len(fanout.displays) > 1 or fanout.samples % 10 == 0:
+        print(f"  {fanout.status()}")
 
-    # 获取进程数
-    process_count = len(psutil.pids())
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="系统监控数据源")
+    parser.add_argument('urls', nargs='*', default=[com_port], metavar='url',
+                        help="一个或多个显示板的传输URL，如 COM31、/dev/ttyACM0、pty://、tcp://host:port、"
+                             "stdout://；可在 # 后为单块显示板指定 format/delta/interval，见 fanout.py")
+    parser.add_argument('--baud', type=int, default=baud_rate)
+    parser.add_argument('--format', choices=('json', 'binary'), default=frame_format)
+    parser.add_argument('--delta', action='store_true', default=delta_mode)
+    parser.add_argument('--adaptive', action='store_true', default=adaptive_mode)
+    parser.add_argument('--interval', type=float, default=send_interval)
+    parser.add_argument('--backend', choices=('psutil', 'proc'), default=collector_backend)
+    parser.add_argument('--events', action='store_true',
+                        help="同时在同一事件循环中读取各显示板发回的事件（点击、帧确认、授信等），"
+                             "用于统计丢帧和往返/显示延迟，以及按下位机授信控制发送")
+    parser.add_argument('--record', metavar='PATH', help="将每次采样录制到环形文件，可用 recording.py 回放")
+    parser.add_argument('--history', metavar='PATH',
+                        help="将每次采样写入SQLite历史库，可用 history.py 按时间范围查询；重启后仍可回填趋势图")
+    return parser.parse_args(argv)
 
-    # 计算网络速率（每秒字节数）
-    current_net_io = psutil.net_io_counters()
-    time_delta = start_time - last_time
-    
-    if time_delta > 0:
-        bytes_sent_rate = int((current_net_io.bytes_sent - last_net_io.bytes_sent) / time_delta)
-        bytes_recv_rate = int((current_net_io.bytes_recv - last_net_io.bytes_recv) / time_delta)
+def print_event(event):
+    """打印下位机发回的事件（帧确认和计数只计入链路统计）"""
+    if event.kind not in ('ack', 'stats', 'render', 'credit', 'backfill', 'keyframe'):
+        print(f"Event from {event.source}: {event.data}")
+
+def send_keyframe(display, event):
+    """下位机（重新）启动后请求关键帧：下一帧发送带time的完整帧，不必等到关键帧间隔"""
+    display.reset()
+
+def send_backfill(display, event):
+    """下位机请求回填历史；这是开发板启动时发出的第一条消息，同时让下一帧成为关键帧"""
+    send_keyframe(display, event)
+    try:
+        count = int(event.data.get('count', 0))
+    except (AttributeError, TypeError, ValueError):
+        return
+    samples, frames = fanout.backfill(display, count)
+    print(f"Backfilled {samples} samples in {frames} frames to {display.name}")
+
+async def run(scheduler, with_events):
+    """采样发送与事件读取共享一个事件循环"""
+    readers = []
+    if with_events:
+        for display in fanout.displays:
+            reader = EventReader(display.port, display.name)
+            reader.on('ack', display.link.on_ack)
+            reader.on('ack', display.on_credit)
+            reader.on('credit', display.on_credit)
+            reader.on('backfill', functools.partial(send_backfill, display))
+            reader.on('keyframe', functools.partial(send_keyframe, display))
+            reader.on('stats', display.link.on_stats)
+            reader.on('render', display.link.on_render)
+            reader.on('*', print_event)
+            reader.start()
+            readers.append(reader)
+    try:
+        await scheduler.run_async(collect_sample, send_sample)
+    finally:
+        for reader in readers:
+            reader.stop()
+            print(reader.status())
+
+def main(argv=None):
+    global frame_format, collector_set, fanout, recorder, history
+    args = parse_args(argv)
+    frame_format = args.format
+
+    # 帧直接写到标准输出时，日志改到标准错误；必须在打开显示板之前切换，打开时的日志也不能混入帧
+    if any(url.startswith('stdout:') for url in args.urls):
+        sys.stdout = sys.stderr
+
+    # 打开所有显示板，每块有独立的后台写线程，链路阻塞不会拖慢采样
+    defaults = {'format': args.format, 'delta': args.delta, 'interval': 0.0}
+    try:
+        fanout = FanOut.open(args.urls, defaults, args.baud, keyframe_interval, writer_queue_size)
+    except (OSError, ValueError) as e:
+        print(f"Failed to open {' '.join(args.urls)}: {e}")
+        return 1
+
+    if args.backend == 'proc':
+        collector_set = CollectorSet(proc_collectors(collector_budgets, proc_count_processes))
     else:
-        bytes_sent_rate = 0
-        bytes_recv_rate = 0
-    
-    # 更新上次记录
-    last_net_io = current_net_io
-    last_time = start_time
-
-    data = {
-        "time": current_time,
-        "cpu": cpu_percent,
-        "memory": memory_percent,
-        "processes": process_count,
-        "net_sent": bytes_sent_rate,
-        "net_recv": bytes_recv_rate
-    }
-
-    return json.dumps(data)
-
-try:
-    while True:
-        info = get_system_info()
-        ser.write((info + '\n').encode('utf-8'))
-        print(f"Sent: {info}")
-        time.sleep(5)  # 每5秒发送一次
-except KeyboardInterrupt:
-    print("Closing serial port...")
-finally:
-    ser.close()
-    print("Serial port closed.")
\ No newline at end of file
+        collector_set = CollectorSet(psutil_collectors(collector_budgets))
+
+    if args.record:
+        recorder = Recorder(args.record, record_capacity)
+
+    if args.history:
+        history = HistoryStore(args.history, history_retention)
+        # 用库中最近的采样预先填充回填缓存，上位机重启后下位机仍能立即拿到完整曲线
+        fanout.history.extend(data for _, data in history.last(fanout.history.maxlen))
+
+    if args.adaptive:
+        scheduler = AdaptiveScheduler(sample_interval, min(min_send_interval, args.interval), args.interval)
+    else:
+        scheduler = AdaptiveScheduler(args.interval, args.interval, args.interval)
+
+    try:
+        asyncio.run(run(scheduler, args.events))
+    except KeyboardInterrupt:
+        print("Closing ports...")
+    finally:
+        fanout.close()
+        collector_set.close()
+        if recorder is not None:
+            recorder.close()
+        if history is not None:
+            history.close()
+            print(history.status())
+        print("Ports closed.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
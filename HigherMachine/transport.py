@@ -0,0 +1,193 @@
+"""
+传输层 - 用URL描述上位机与下位机之间的链路
+
+支持的URL:
+    COM31, /dev/ttyUSB0           串口（省略scheme时视为串口）
+    serial:///dev/ttyACM0?baud=115200
+    pty://                        新建伪终端对，模拟下位机连接打印出的从端路径
+    tty:///dev/pts/3              直接打开已有的终端设备（如pty://的从端），不依赖pyserial
+    tcp://host:port               作为客户端连接
+    tcp-listen://host:port        作为服务端等待一个连接
+    file:///tmp/frames.bin        写入时追加到文件，读取时从文件读
+    stdout://                     写到标准输出，从标准输入读
+
+所有传输都提供与pyserial一致的 write/read/readline/in_waiting/fileno/close 接口，
+因此不接开发板也能在Linux上运行和压测整条链路。
+"""
+import os
+import select
+import socket
+import struct
+import sys
+import urllib.parse
+
+# 伪终端与FIONREAD仅POSIX系统可用，Windows上只能使用串口和TCP
+try:
+    import fcntl
+    import termios
+    import tty
+except ImportError:
+    fcntl = None
+
+DEFAULT_BAUD_RATE = 115200
+
+
+class FdTransport:
+    """基于文件描述符的传输（伪终端、套接字、文件、标准输入输出）"""
+
+    def __init__(self, read_fd, write_fd=None, name='', timeout=1.0, owns_fds=True):
+        self.read_fd = read_fd
+        self.write_fd = read_fd if write_fd is None else write_fd
+        self.name = name
+        self.timeout = timeout
+        self.owns_fds = owns_fds
+        self.buffer = bytearray()
+
+    def fileno(self):
+        return self.read_fd
+
+    def write(self, data):
+        view = memoryview(data)
+        while view:
+            n = os.write(self.write_fd, view)
+            view = view[n:]
+        return len(data)
+
+    def _fill(self, timeout):
+        """等待可读并读入内部缓冲区，返回是否读到数据"""
+        ready, _, _ = select.select([self.read_fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            chunk = os.read(self.read_fd, 4096)
+        except OSError:
+            # 伪终端另一端关闭时读取会报EIO
+            chunk = b''
+        self.buffer += chunk
+        return bool(chunk)
+
+    @property
+    def in_waiting(self):
+        """可立即读取的字节数"""
+        pending = 0
+        if fcntl is not None:
+            try:
+                raw = fcntl.ioctl(self.read_fd, termios.FIONREAD, b'\0\0\0\0')
+                pending = struct.unpack('i', raw)[0]
+            except OSError:
+                pass
+        return len(self.buffer) + pending
+
+    def read(self, size=1):
+        """读取最多size字节，超时返回已读到的部分"""
+        while len(self.buffer) < size and self._fill(self.timeout):
+            pass
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def readline(self):
+        """读取一行（含换行符），超时返回已读到的部分"""
+        while b'\n' not in self.buffer and self._fill(self.timeout):
+            pass
+        end = self.buffer.find(b'\n') + 1 or len(self.buffer)
+        data = bytes(self.buffer[:end])
+        del self.buffer[:end]
+        return data
+
+    def close(self):
+        if not self.owns_fds:
+            return
+        os.close(self.read_fd)
+        if self.write_fd != self.read_fd:
+            os.close(self.write_fd)
+
+
+class SocketTransport(FdTransport):
+    """TCP连接，保持socket对象的引用以免被回收"""
+
+    def __init__(self, sock, name=''):
+        super().__init__(sock.fileno(), name=name, owns_fds=False)
+        self.sock = sock
+
+    def write(self, data):
+        self.sock.sendall(data)
+        return len(data)
+
+    def close(self):
+        self.sock.close()
+
+
+class PtyTransport(FdTransport):
+    """伪终端主端，slave_path为模拟下位机应打开的从端"""
+
+    def __init__(self):
+        master, slave = os.openpty()
+        # 原始模式，避免行规程改写二进制帧
+        tty.setraw(slave)
+        self.slave_fd = slave
+        self.slave_path = os.ttyname(slave)
+        super().__init__(master, name=self.slave_path)
+
+    def close(self):
+        super().close()
+        os.close(self.slave_fd)
+
+
+def _open_serial(port, baud_rate, timeout):
+    import serial
+
+    return serial.Serial(port, baud_rate, timeout=timeout)
+
+
+def _host_port(parsed):
+    return parsed.hostname or '', parsed.port
+
+
+def open_transport(url, baud_rate=DEFAULT_BAUD_RATE, timeout=1.0):
+    """根据URL打开传输"""
+    parsed = urllib.parse.urlsplit(url)
+    scheme = parsed.scheme
+    path = parsed.path
+    # Windows串口名 COM31 及 /dev/xxx 不带scheme，视为串口
+    if not scheme:
+        return _open_serial(url, baud_rate, timeout)
+
+    if scheme == 'serial':
+        query = urllib.parse.parse_qs(parsed.query)
+        baud = int(query.get('baud', [baud_rate])[0])
+        return _open_serial(parsed.netloc + path, baud, timeout)
+
+    if scheme == 'pty':
+        return PtyTransport()
+
+    if scheme == 'tty':
+        fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+        if fcntl is not None:
+            tty.setraw(fd)
+        return FdTransport(fd, name=path, timeout=timeout)
+
+    if scheme == 'tcp':
+        sock = socket.create_connection(_host_port(parsed))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return SocketTransport(sock, url)
+
+    if scheme == 'tcp-listen':
+        server = socket.create_server(_host_port(parsed))
+        print(f"Waiting for connection on {url}...")
+        sock, addr = server.accept()
+        server.close()
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return SocketTransport(sock, f"tcp://{addr[0]}:{addr[1]}")
+
+    if scheme == 'file':
+        write_fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        read_fd = os.open(path, os.O_RDONLY)
+        return FdTransport(read_fd, write_fd, name=path, timeout=timeout)
+
+    if scheme == 'stdout':
+        # 用原始的标准输出：调用方可能已把 sys.stdout 换成标准错误来输出日志
+        return FdTransport(sys.__stdin__.fileno(), sys.__stdout__.fileno(), name='stdout',
+                           timeout=timeout, owns_fds=False)
+
+    raise ValueError(f"unsupported transport: {url}")
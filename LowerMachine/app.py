@@ -0,0 +1,240 @@
+"""
+显示程序运行时 - 基于uasyncio
+
+LVGL使用 lv_utils.event_loop(asynchronous=True)，tick和task_handler本身就是uasyncio任务，
+数据接收、页面刷新和触摸检查也作为协作任务运行在同一个事件循环上：
+
+    ingest  非阻塞读取串口，每帧计入所有页面的统计和链路统计，有新数据时标记需要刷新；
+            不合并时等每一帧绘制完成再处理下一帧
+    render  刷新调度：按最高帧率和延迟上限把标记合并为一帧，按最新数据更新当前页面并绘制一次，
+            绘制后回送确认（见 render_scheduler.py）
+    touch   定期检查触摸并切换页面
+    credit  没有新帧时定期向上位机重新授信（流控，见 link.py）
+    clock   每秒推进设备时钟并更新时间标签，上位机只在关键帧中校正时间（见 clock.py）；
+            开发板在两个关键帧之间启动时，每秒请求一次关键帧直到时钟同步
+
+启动时请求上位机回填趋势历史；上位机晚于开发板启动时，收到第一帧后再请求一次。
+
+任何任务都不会阻塞调度器，取代原来 while True + time.sleep 的主循环。
+入口为 main()，display_monitor.py 直接调用它。
+"""
+import gc
+import machine
+import usys as sys
+
+import lvgl as lv
+import lv_utils
+import micropython
+import uasyncio
+
+from clock import Clock
+from config import SERIAL, RUNTIME, FLOW
+from frame_codec import is_batch, decode_batch
+from ingest import Ingest
+from link import Link
+from telemetry import Telemetry, TIME
+from page_monitor import MonitorPage
+from page_trend import TrendPage
+from page_manager import PageManager
+from render_scheduler import RenderScheduler, REASON_DATA, REASON_TOUCH, REASON_BACKFILL, REASON_CLOCK
+
+
+class Driver:
+    """显示屏与触摸屏驱动"""
+
+    def __init__(self):
+        machine.freq(240000000)  # set the CPU frequency to 240 MHz
+        print("CPU freq : ", machine.freq() / 1000000, "MHz")
+
+    def init_gui(self, asynchronous=True):
+        import ili9488 as tft
+        import ft6236 as tp
+
+        hres = 480
+        vres = 320
+
+        # Register display driver
+        self.event_loop = lv_utils.event_loop(asynchronous=asynchronous)
+        tft.deinit()
+        tft.init()
+        tp.init()
+
+        disp_buf1 = lv.disp_draw_buf_t()
+        buf1_1 = tft.framebuffer(1)
+        buf1_2 = tft.framebuffer(2)
+        disp_buf1.init(buf1_1, buf1_2, len(buf1_1) // lv.color_t.__SIZE__)
+        disp_drv = lv.disp_drv_t()
+        disp_drv.init()
+        disp_drv.draw_buf = disp_buf1
+        disp_drv.flush_cb = tft.flush
+        disp_drv.hor_res = hres
+        disp_drv.ver_res = vres
+        disp_drv.register()
+
+        # Register touch sensor
+        indev_drv = lv.indev_drv_t()
+        indev_drv.init()
+        indev_drv.type = lv.INDEV_TYPE.POINTER
+        indev_drv.read_cb = tp.ts_read
+        indev_drv.register()
+
+
+class App:
+    """把接收、刷新和触摸作为uasyncio任务运行"""
+
+    def __init__(self, page_manager, stream):
+        self.page_manager = page_manager
+        self.data = Telemetry()                 # 按固定字段解析到预分配的槽位
+        self.ingest = Ingest(stream)
+        self.link = Link(sys.stdout)            # 序号统计，确认经标准输出回送上位机
+        self.clock = Clock()
+        self.scheduler = RenderScheduler(self._render_frame, self._frame_done,
+                                         RUNTIME['max_fps'], RUNTIME['deadline_ms'])
+
+        # 统计
+        self.received = 0        # 已解码的帧数
+        self.renders = 0         # 页面刷新次数
+        self.coalesced = 0       # 收到但没有单独刷新界面的帧
+        self.render_ms = 0       # 刷新耗时的滑动平均（毫秒）
+        self.backfilled = 0      # 回填载入的样本数
+        self.backfill_requests = 0
+
+    def credit(self):
+        """按刷新耗时和剩余内存计算授信帧数，未启用流控时返回-1"""
+        if not FLOW['enabled']:
+            return -1
+        if gc.mem_free() < FLOW['low_heap']:
+            gc.collect()
+            return 1
+        return max(1, min(FLOW['max_credit'], FLOW['horizon_ms'] // max(1, self.render_ms)))
+
+    async def ingest_task(self):
+        """读取所有已到达的帧，有新数据时标记需要刷新"""
+        data = self.data
+        page_manager = self.page_manager
+        coalesce = SERIAL['coalesce']
+        while True:
+            received = self.received
+            try:
+                for frame in self.ingest.poll(0, drain=coalesce):
+                    if is_batch(frame):
+                        # 回填的历史一次性载入，不走逐帧的统计路径
+                        first, rows = decode_batch(frame)
+                        page_manager.load_history(rows, first)
+                        self.backfilled += len(rows)
+                        if data.synced:
+                            self.scheduler.mark(REASON_BACKFILL)
+                        continue
+                    if not data.decode(frame):
+                        continue
+                    self.received += 1
+                    if self.received == 1 and not self.backfilled and self.backfill_requests < 2:
+                        self.request_backfill()
+                    if data.changed & (1 << TIME):
+                        self.clock.set(data.values[TIME])
+                    if data.seq >= 0:
+                        self.link.track(data.seq, data.ts)
+                    # 每帧都计入统计；合并模式下界面只按最新一帧刷新
+                    page_manager.record(data)
+                    if self.scheduler.dirty & REASON_DATA:
+                        self.coalesced += 1
+                    self.scheduler.mark(REASON_DATA)
+                    if not coalesce:
+                        # 逐帧刷新：等这一帧绘制完成（并已回送确认）再处理下一帧
+                        while self.scheduler.dirty & REASON_DATA:
+                            await uasyncio.sleep_ms(max(0, self.scheduler.wait_ms()))
+            except Exception as e:
+                print(f"Error: {e}")
+            if self.received != received:
+                # 每次最多读取一个缓冲区，读完先让出给刷新和触摸任务，再接着读剩余的数据
+                await uasyncio.sleep_ms(0)
+            else:
+                await uasyncio.sleep_ms(RUNTIME['poll_ms'])
+
+    def _render_frame(self, reasons):
+        """刷新调度的render回调：只有时钟变化时不必重新设置页面内容"""
+        if reasons & (REASON_DATA | REASON_TOUCH | REASON_BACKFILL):
+            self.page_manager.render_current_page(self.data)
+
+    def _frame_done(self, reasons):
+        """绘制完成后回送确认，并定期上报计数"""
+        self.renders += 1
+        self.render_ms = self.scheduler.frame_ms
+        self.link.ack(self.credit())
+        report = SERIAL['stats_report']
+        if report and self.renders % report == 0:
+            self.link.report(self.coalesced, *self.page_manager.label_stats())
+            self.scheduler.report(self.link.out)
+
+    async def render_task(self):
+        """按最高帧率刷新屏幕，见 render_scheduler.py"""
+        await self.scheduler.run()
+
+    async def touch_task(self):
+        """检查触摸并切换页面，切换后立即按当前数据刷新新页面"""
+        while True:
+            try:
+                if self.page_manager.check_touch_and_switch() and self.data.synced:
+                    self.scheduler.mark(REASON_TOUCH)
+            except Exception as e:
+                print(f"Touch error: {e}")
+            await uasyncio.sleep_ms(RUNTIME['touch_ms'])
+
+    async def credit_task(self):
+        """定期重新授信，授信用完、上位机停发时由此恢复"""
+        while True:
+            await uasyncio.sleep_ms(RUNTIME['credit_ms'])
+            credit = self.credit()
+            if credit >= 0:
+                self.link.grant(credit)
+
+    async def clock_task(self):
+        """在每个整秒更新时间标签；已收到数据但还没有收到时间时请求关键帧"""
+        clock = self.clock
+        while True:
+            if not clock.synced:
+                if self.ingest.frames:
+                    self.link.request_keyframe()
+            else:
+                try:
+                    self.page_manager.tick(clock.now())
+                    self.scheduler.mark(REASON_CLOCK)
+                except Exception as e:
+                    print(f"Clock error: {e}")
+            await uasyncio.sleep_ms(clock.ms_to_next_second())
+
+    def request_backfill(self):
+        if SERIAL['backfill']:
+            self.backfill_requests += 1
+            self.link.request_backfill(SERIAL['backfill'])
+
+    async def run(self):
+        self.request_backfill()
+        await uasyncio.gather(self.ingest_task(), self.render_task(), self.touch_task(),
+                              self.credit_task(), self.clock_task())
+
+
+def create_pages():
+    """创建页面并加载第一页"""
+    page_manager = PageManager()
+    page_manager.add_page(MonitorPage())
+    page_manager.add_page(TrendPage())
+    page_manager.load_current_page()
+    return page_manager
+
+
+async def start():
+    # LVGL的tick与刷新任务需要在事件循环中创建
+    if not lv_utils.event_loop.is_running():
+        Driver().init_gui(asynchronous=True)
+    page_manager = create_pages()
+
+    # 二进制帧中可能出现0x03，需关闭Ctrl-C中断，否则会被当作KeyboardInterrupt
+    if SERIAL['binary_frames']:
+        micropython.kbd_intr(-1)
+
+    await App(page_manager, sys.stdin.buffer).run()
+
+
+def main():
+    uasyncio.run(start())
@@ -0,0 +1,67 @@
+"""
+解析基准测试 - 对比 ujson.loads 与 Telemetry.decode
+
+在开发板上运行: mpremote run bench_telemetry.py
+输出每种方式每帧的耗时（微秒）和堆分配（字节，来自 gc.mem_alloc() 的差值）。
+测试帧与上位机当前发送的格式一致：time为整数秒，每帧带 seq/ts；二进制帧只有Telemetry能解析。
+"""
+import gc
+import time
+import ujson
+import ustruct as struct
+
+from frame_codec import (FRAME_MAGIC, FRAME_VERSION, FRAME_TYPE_FULL, FRAME_TYPE_DELTA, FRAME_FLAG_STAMPED,
+                         HEADER_FORMAT, FULL_FORMAT)
+from telemetry import Telemetry
+
+ROUNDS = 500
+
+LINE = (b'{"time": 1714566896, "cpu": 23.4, "memory": 61.7, "processes": 312, "net_sent": 10240, '
+        b'"net_recv": 204800, "seq": 1234, "ts": 56789012}')
+DELTA_LINE = b'{"cpu": 25.1, "net_recv": 198000, "d": 1, "seq": 1235, "ts": 56789512}'
+
+
+def stamped_frame(frame_type, seq, ts, payload):
+    """带序号的二进制帧，与上位机 frame_codec.stamp 的输出相同"""
+    payload = struct.pack('<HI', seq, ts) + payload
+    return struct.pack(HEADER_FORMAT, FRAME_MAGIC, FRAME_VERSION, frame_type | FRAME_FLAG_STAMPED,
+                       len(payload)) + payload
+
+
+FRAME = stamped_frame(FRAME_TYPE_FULL, 1234, 56789012,
+                      struct.pack(FULL_FORMAT, 1714566896, 234, 617, 312, 10240, 204800))
+# 增量帧：cpu(第1位)和net_recv(第5位)变化
+DELTA_FRAME = stamped_frame(FRAME_TYPE_DELTA, 1235, 56789512, struct.pack('<BHI', 0x22, 251, 198000))
+
+
+def measure(name, fn, line):
+    """运行ROUNDS次，打印每帧的平均耗时和堆分配"""
+    view = memoryview(line)
+    fn(view)
+    gc.collect()
+    gc.disable()
+    before = gc.mem_alloc()
+    start = time.ticks_us()
+    for _ in range(ROUNDS):
+        fn(view)
+    elapsed = time.ticks_diff(time.ticks_us(), start)
+    used = gc.mem_alloc() - before
+    gc.enable()
+    print("%-22s %6d us/frame %6d bytes/frame" % (name, elapsed // ROUNDS, used // ROUNDS))
+
+
+def run():
+    state = {}
+    telemetry = Telemetry()
+
+    def with_ujson(view):
+        state.update(ujson.loads(view))
+
+    for label, line in (('full', LINE), ('delta', DELTA_LINE)):
+        measure("ujson.loads " + label, with_ujson, line)
+        measure("Telemetry " + label, telemetry.decode, line)
+    for label, frame in (('binary full', FRAME), ('binary delta', DELTA_FRAME)):
+        measure("Telemetry " + label, telemetry.decode, frame)
+
+
+run()
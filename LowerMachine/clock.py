@@ -0,0 +1,55 @@
+"""
+设备时钟 - 由 time.ticks_ms 推算当前时间，收到上位机的时间时校正
+
+上位机只在完整关键帧中发送整数秒，增量帧不带时间；界面上的时钟由这里每秒推进一次，
+不再依赖采样频率，也不必每帧解析和切分时间字符串。
+
+上位机的秒数是向下取整的，因此收到的时间只说明“当前时刻不早于它”：
+本地推算落后时向前校正；本地走快超过一秒时退回。其余情况保持不变，避免时钟来回跳动。
+"""
+import time
+
+# 每隔这么久（秒）以收到的时间重新建立基准，使ticks_diff始终在有效范围内
+REBASE_SECONDS = 86400
+
+
+class Clock:
+    """以收到的墙上时间为基准、ticks_ms推进的时钟"""
+
+    def __init__(self):
+        self.base = -1             # 基准时刻的秒数，-1表示尚未收到时间
+        self.base_ticks = 0        # 基准时刻的ticks_ms
+        self.offset_ms = 0         # 校正量（毫秒）
+        self.corrections = 0       # 校正次数
+
+    @property
+    def synced(self):
+        return self.base >= 0
+
+    def _elapsed_ms(self):
+        """距基准时刻的毫秒数"""
+        return time.ticks_diff(time.ticks_ms(), self.base_ticks) + self.offset_ms
+
+    def set(self, seconds):
+        """收到上位机的时间"""
+        if self.base < 0 or seconds - self.base >= REBASE_SECONDS:
+            self.base = seconds
+            self.base_ticks = time.ticks_ms()
+            self.offset_ms = 0
+            return
+        error = (seconds - self.base) * 1000 - self._elapsed_ms()
+        if error > 0 or error < -1000:
+            self.offset_ms += error
+            self.corrections += 1
+
+    def now(self):
+        """当前秒数，未同步时返回-1"""
+        if self.base < 0:
+            return -1
+        return self.base + self._elapsed_ms() // 1000
+
+    def ms_to_next_second(self):
+        """距下一个整秒的毫秒数"""
+        if self.base < 0:
+            return 1000
+        return 1000 - self._elapsed_ms() % 1000
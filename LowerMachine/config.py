@@ -41,3 +41,34 @@ SCREEN = {
     'width': 480,
     'height': 320,
 }
+
+# 趋势页配置，见 page_trend.py
+TREND = {
+    'mode': 'chart',             # 'chart' 使用lv.chart原地更新折线；'ascii' 为旧的字符画图表
+    'points': 50,                # 每个图表显示的数据点数
+}
+
+# 串口协议配置
+SERIAL = {
+    'binary_frames': False,      # 上位机使用二进制帧时开启（会关闭Ctrl-C中断）
+    'coalesce': True,            # 帧合并：积压的帧只计入统计，界面只按最新一帧刷新；False时每帧都单独绘制
+    'backfill': 50,              # 启动时请求上位机回填的历史样本数，0表示不请求
+    'stats_report': 100,         # 每刷新多少次向上位机上报一次链路计数（丢帧、乱序、合并帧数），0表示不上报
+}
+
+# 运行时任务间隔（毫秒），见 app.py
+RUNTIME = {
+    'poll_ms': 20,               # 读取串口的间隔
+    'touch_ms': 50,              # 检查触摸的间隔
+    'credit_ms': 1000,           # 没有新帧时重新发送授信的间隔
+    'max_fps': 20,               # 屏幕刷新的最高帧率，期间到达的数据合并为一帧（见 render_scheduler.py）
+    'deadline_ms': 100,          # 数据到达后最迟多久刷新到屏幕
+}
+
+# 流控：按实测的刷新耗时和剩余内存向上位机授信，上位机只在有授信时发送，见 link.py
+FLOW = {
+    'enabled': True,
+    'horizon_ms': 1000,          # 授信的帧数按这段时间内能刷新多少次计算
+    'max_credit': 8,             # 授信上限
+    'low_heap': 20000,           # 剩余内存低于此值（字节）时只授信1帧
+}
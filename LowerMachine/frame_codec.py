@@ -0,0 +1,116 @@
+"""
+遥测帧格式 - 与上位机 HigherMachine/frame_codec.py 对应
+
+同一串口上可混合接收JSON行与二进制帧：以 FRAME_MAGIC 开头的是二进制帧，
+其余按JSON行处理。消息的切分由 ingest.py 完成（frame_length），
+完整帧和增量帧由 telemetry.py 按这里的常量原地解析到预分配的槽位。
+
+批量帧（FRAME_TYPE_BATCH，历史回填）由 is_batch / decode_batch 单独处理。
+另外提供整数秒与日期之间的换算（format_time 等），供解析和时钟显示使用。
+"""
+import ustruct as struct
+import ujson
+
+FRAME_MAGIC = 0xA5
+FRAME_VERSION = 1
+
+FRAME_TYPE_FULL = 0x01
+FRAME_TYPE_DELTA = 0x02
+FRAME_TYPE_BATCH = 0x03
+
+# type的最高位，表示负载前带有序号和发送时间戳 seq(uint16) ts(uint32)
+FRAME_FLAG_STAMPED = 0x80
+STAMP_SIZE = 6
+
+HEADER_FORMAT = '<BBBH'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+FULL_FORMAT = '<IHHIII'
+FULL_SIZE = struct.calcsize(FULL_FORMAT)
+
+# 字段顺序与完整帧负载一致
+FIELDS = ('time', 'cpu', 'memory', 'processes', 'net_sent', 'net_recv')
+FIELD_SIZES = (4, 2, 2, 4, 4, 4)
+
+# 批量帧：flags(uint8) count(uint8)，之后每个样本为 cpu(uint16) memory(uint16) net_sent(uint32) net_recv(uint32)
+BATCH_SAMPLE_FORMAT = '<HHII'
+BATCH_SAMPLE_SIZE = 12
+BATCH_FLAG_FIRST = 0x01
+
+# 负载最大长度，超过即认为数据错乱
+MAX_PAYLOAD = 256
+
+def civil_from_days(days):
+    """将1970-01-01起的天数转换为 (年, 月, 日)"""
+    days += 719468
+    era = days // 146097
+    doe = days - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = mp + 3 if mp < 10 else mp - 9
+    year = yoe + era * 400 + (1 if month <= 2 else 0)
+    return year, month, day
+
+
+def days_from_civil(year, month, day):
+    """civil_from_days的逆运算：将 (年, 月, 日) 转换为1970-01-01起的天数"""
+    year -= 1 if month <= 2 else 0
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month - 3 if month > 2 else month + 9) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def format_time(ts):
+    """将整数秒格式化为 'YYYY-MM-DD HH:MM:SS'"""
+    days, secs = divmod(ts, 86400)
+    year, month, day = civil_from_days(days)
+    return "%04d-%02d-%02d %02d:%02d:%02d" % (
+        year, month, day, secs // 3600, secs // 60 % 60, secs % 60)
+
+
+def frame_length(buf, n, offset=0):
+    """
+    buf从offset开始的n字节以FRAME_MAGIC开头时，返回整帧长度；头部未收齐返回0
+    头部不合法时抛出ValueError，调用方应丢弃一个字节重新同步
+    """
+    if n < HEADER_SIZE:
+        return 0
+    version = buf[offset + 1]
+    length = buf[offset + 3] | (buf[offset + 4] << 8)
+    if version != FRAME_VERSION or length > MAX_PAYLOAD:
+        raise ValueError("bad frame header")
+    return HEADER_SIZE + length
+
+
+def is_batch(buf):
+    """是否为批量回填帧（二进制，或以 {"b" 开头的JSON行）"""
+    if buf[0] == FRAME_MAGIC:
+        return buf[2] & ~FRAME_FLAG_STAMPED == FRAME_TYPE_BATCH
+    return len(buf) > 4 and buf[1] == 34 and buf[2] == 98 and buf[3] == 34
+
+
+def decode_batch(buf):
+    """
+    解码批量回填帧，返回 (是否为一次回填的第一帧, 样本列表)
+    样本为 (cpu, memory, net_sent, net_recv)，旧的在前，cpu/memory已还原为百分比
+    """
+    if buf[0] != FRAME_MAGIC:
+        msg = ujson.loads(buf)
+        rows = msg['b']
+        first = bool(msg.get('r'))
+    else:
+        offset = HEADER_SIZE
+        if buf[2] & FRAME_FLAG_STAMPED:
+            offset += STAMP_SIZE
+        first = bool(buf[offset] & BATCH_FLAG_FIRST)
+        count = buf[offset + 1]
+        offset += 2
+        rows = []
+        for _ in range(count):
+            rows.append(struct.unpack_from(BATCH_SAMPLE_FORMAT, buf, offset))
+            offset += BATCH_SAMPLE_SIZE
+    return first, [(row[0] / 10, row[1] / 10, row[2], row[3]) for row in rows]
@@ -0,0 +1,159 @@
+"""
+非阻塞数据接收 - 基于uselect.poll
+
+只读取当前已到达的字节，攒成完整的消息（二进制帧或JSON行）后交给调用方，没有数据时立即返回。
+主循环因此可以每轮都处理触摸和刷新，不再被 readline() 阻塞，也不需要固定的 sleep。
+
+接收缓冲区是启动时预先分配的bytearray，数据通过readinto写入，消息边界在缓冲区内原地查找，
+交给解析器的是缓冲区的memoryview切片，不复制数据，也不为每行新建str。
+每收到一帧的堆分配只有这个切片对象本身，可用 gc.mem_alloc() 前后的差值验证（见 measure_alloc）。
+"""
+import gc
+import uselect
+
+from frame_codec import FRAME_MAGIC, frame_length
+
+# 接收缓冲区大小，同时也是JSON行的最大长度，超过即认为数据错乱并丢弃
+BUFFER_SIZE = 512
+
+
+class Ingest:
+    """从流中非阻塞地接收消息"""
+
+    def __init__(self, stream, max_bytes=256, size=BUFFER_SIZE):
+        self.stream = stream
+        self.poller = uselect.poll()
+        self.poller.register(stream, uselect.POLLIN)
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.byte = bytearray(1)     # readinto的中转字节
+        self.start = 0               # 未处理数据的起点
+        self.end = 0                 # 已接收数据的终点
+        self.scanned = 0             # 已确认不含换行符的位置，避免重复扫描
+        self.overflow = False        # 正在丢弃超长行的剩余部分
+        self.max_bytes = max_bytes   # 每次调用最多读取的字节数，避免数据持续到达时占住主循环
+
+        # 统计
+        self.frames = 0
+        self.resyncs = 0             # 因数据错乱丢弃的次数
+
+    def _ready(self, timeout_ms):
+        """是否有数据可读；ipoll不像poll那样每次新建结果列表"""
+        for _ in self.poller.ipoll(timeout_ms):
+            return True
+        return False
+
+    def _compact(self):
+        """把未处理的数据移到缓冲区开头"""
+        start = self.start
+        if start:
+            n = self.end - start
+            self.view[0:n] = self.view[start:self.end]
+            self.start = 0
+            self.end = n
+            self.scanned -= start
+
+    def _read_available(self, timeout_ms):
+        """读取已到达的字节；timeout_ms>0时，没有数据会最多等待这么久"""
+        self._compact()
+        buf = self.buf
+        byte = self.byte
+        size = len(buf)
+        n = 0
+        # stdin的readinto会阻塞到读满为止，因此在poll确认有数据后逐字节读取
+        while n < self.max_bytes and self.end < size and self._ready(timeout_ms if n == 0 else 0):
+            if not self.stream.readinto(byte):
+                break
+            buf[self.end] = byte[0]
+            self.end += 1
+            n += 1
+        return n
+
+    def _next_message(self):
+        """
+        检查未处理数据的开头，返回 (消息长度, 需要丢弃的字节数)
+        消息不完整时返回 (0, 0)
+        """
+        buf = self.buf
+        start = self.start
+        n = self.end - start
+        if n == 0:
+            return 0, 0
+        if buf[start] == FRAME_MAGIC and not self.overflow:
+            try:
+                size = frame_length(buf, n, start)
+            except ValueError:
+                self.resyncs += 1
+                return 0, 1
+            if size and n >= size:
+                return size, size
+            if start == 0 and self.end == len(buf):
+                # 缓冲区已满仍不完整，不可能是合法帧
+                self.resyncs += 1
+                return 0, 1
+            return 0, 0
+
+        i = max(self.scanned, start)
+        end = self.end
+        while i < end and buf[i] != 10:
+            i += 1
+        if i == end:
+            self.scanned = end
+            if start == 0 and end == len(buf):
+                self.resyncs += 1
+                self.overflow = True
+                return 0, n
+            return 0, 0
+        if self.overflow:
+            self.overflow = False
+            return 0, i + 1 - start
+        # 去掉行尾的 \r
+        size = i
+        while size > start and buf[size - 1] in (13, 32):
+            size -= 1
+        return size - start, i + 1 - start
+
+    def poll(self, timeout_ms=0, drain=False):
+        """
+        读取当前可用的数据，依次产生完整的消息
+        drain为True时继续读取新到达的数据（帧合并模式用），但每次调用最多读取一个缓冲区大小的字节，
+        数据持续到达时也会返回，让调用方有机会刷新；否则每次最多读取max_bytes
+        产生的memoryview指向接收缓冲区，只在下一次迭代前有效
+        """
+        budget = len(self.buf) if drain else 0
+        budget -= self._read_available(timeout_ms)
+        while True:
+            size, skip = self._next_message()
+            if skip == 0:
+                if budget > 0:
+                    n = self._read_available(0)
+                    if n:
+                        budget -= n
+                        continue
+                break
+            # 先移出已处理区域再交给调用方，即使解码出错也不会重复处理同一条消息
+            start = self.start
+            self.start += skip
+            if self.start == self.end:
+                self.start = self.end = self.scanned = 0
+            if size:
+                self.frames += 1
+                yield self.view[start:start + size]
+
+
+def measure_alloc(ingest, handle, rounds=100):
+    """
+    调用 ingest.poll() rounds 次，把每条消息交给handle，返回 (消息数, 平均每条消息的堆分配字节数)
+    用于对比接收方式的内存开销，例如 handle=lambda frame: None 只测量接收本身
+    """
+    gc.collect()
+    gc.disable()
+    frames = 0
+    before = gc.mem_alloc()
+    for _ in range(rounds):
+        for frame in ingest.poll():
+            handle(frame)
+            frames += 1
+    used = gc.mem_alloc() - before
+    gc.enable()
+    return frames, used // frames if frames else 0
@@ -0,0 +1,103 @@
+"""
+链路统计与确认 - 与上位机 HigherMachine/link.py 对应
+
+上位机给每帧加上递增的序号（模65536）和发送时间戳。这里根据序号统计:
+    lost        序号缺口，即在串口上丢失的帧
+    reorders    序号比已收到的更旧（迟到的帧），已计入lost的缺口相应减一
+    duplicates  与上一帧序号相同
+界面按最新一帧刷新后回送确认，上位机据此计算往返和显示延迟:
+    {"type": "ack", "seq": 12, "ts": 345678, "hold": 15}
+hold为从收到该帧到刷新界面的毫秒数。计数定期以 {"type": "stats", ...} 上报。
+启动时以 {"type": "backfill", "count": N} 请求回填趋势历史，上位机同时让下一帧成为带时间的关键帧；
+已收到数据但时钟仍未同步（如开发板在两个关键帧之间重启）时，每秒发送 {"type": "keyframe"} 请求关键帧。
+
+流控：确认中带有 "credit": N，表示上位机在该序号之后还可以发送N帧；
+没有新帧时也会定期单独发送 {"type": "credit", "seq": 最近收到的序号, "credit": N}，
+避免授信用完后双方互相等待。seq为-1表示还没有收到过帧，授信从上位机当前序号算起。
+"""
+import time
+
+SEQ_MODULO = 0x10000
+
+# 连续这么多帧都比已收到的更旧时，认为上位机重启了序号，以新序号为准
+RESYNC_AFTER = 3
+
+
+class Link:
+    """序号跟踪与确认回送"""
+
+    def __init__(self, out):
+        self.out = out               # 回送确认的流（sys.stdout）
+        self.last_seq = -1
+        self.behind = 0              # 连续收到的旧序号帧数
+
+        # 等待确认的最新一帧
+        self.ack_seq = -1
+        self.ack_ts = 0
+        self.ack_ticks = 0
+
+        # 计数
+        self.received = 0
+        self.lost = 0
+        self.reorders = 0
+        self.duplicates = 0
+        self.acks = 0
+
+    def track(self, seq, ts):
+        """解码出一帧带序号的数据后调用"""
+        self.received += 1
+        if self.last_seq >= 0:
+            gap = (seq - self.last_seq - 1) % SEQ_MODULO
+            if gap == SEQ_MODULO - 1:
+                self.duplicates += 1
+                return
+            if gap >= SEQ_MODULO // 2:
+                self.behind += 1
+                if self.behind < RESYNC_AFTER:
+                    self.reorders += 1
+                    if self.lost:
+                        self.lost -= 1
+                    return
+            else:
+                self.lost += gap
+        self.behind = 0
+        self.last_seq = seq
+        self.ack_seq = seq
+        self.ack_ts = ts
+        self.ack_ticks = time.ticks_ms()
+
+    def ack(self, credit=-1):
+        """界面刷新后调用，确认最新一帧；之前合并掉的帧不单独确认。credit<0表示不启用流控"""
+        if self.ack_seq < 0:
+            return
+        hold = time.ticks_diff(time.ticks_ms(), self.ack_ticks)
+        if credit >= 0:
+            self.out.write('{"type": "ack", "seq": %d, "ts": %d, "hold": %d, "credit": %d}\n'
+                           % (self.ack_seq, self.ack_ts, hold, credit))
+        else:
+            self.out.write('{"type": "ack", "seq": %d, "ts": %d, "hold": %d}\n' % (self.ack_seq, self.ack_ts, hold))
+        self.ack_seq = -1
+        self.acks += 1
+
+    def grant(self, credit):
+        """单独发送授信"""
+        self.out.write('{"type": "credit", "seq": %d, "credit": %d}\n' % (self.last_seq, credit))
+
+    def request_backfill(self, count):
+        """请求上位机回填最近count次采样，见 frame_codec.decode_batch"""
+        self.out.write('{"type": "backfill", "count": %d}\n' % count)
+
+    def request_keyframe(self):
+        """请求上位机下一帧发送带时间的完整关键帧"""
+        self.out.write('{"type": "keyframe"}\n')
+
+    def report(self, coalesced=0, applied=0, skipped=0, frame_applied=0, frame_skipped=0):
+        """
+        上报计数，applied/skipped为界面标签实际更新与跳过的累计次数，
+        frame_applied/frame_skipped为最近一帧中的次数（见 ui_components.Binder）
+        """
+        self.out.write('{"type": "stats", "received": %d, "lost": %d, "reorders": %d, '
+                       '"duplicates": %d, "acks": %d, "coalesced": %d, "applied": %d, "skipped": %d, '
+                       '"frame_applied": %d, "frame_skipped": %d}\n'
+                       % (self.received, self.lost, self.reorders, self.duplicates, self.acks, coalesced,
+                          applied, skipped, frame_applied, frame_skipped))
@@ -82,6 +82,44 @@ class PageManager:
         if self.current_page:
             self.current_page.update(data)
     
+    def record(self, data):
+        """把一帧数据计入所有页面的统计和历史，不刷新界面"""
+        for page in self.pages:
+            page.record(data)
+    
+    def load_history(self, rows, replace=False):
+        """把回填的历史批量载入所有有趋势历史的页面"""
+        for page in self.pages:
+            if hasattr(page, 'load_history'):
+                page.load_history(rows, replace)
+    
+    def tick(self, ts):
+        """设备时钟每秒调用一次，更新所有显示时钟的页面"""
+        for page in self.pages:
+            if hasattr(page, 'tick'):
+                page.tick(ts)
+    
+    def label_stats(self):
+        """
+        标签绑定的计数 (实际更新数, 因内容未变跳过的次数, 当前页最近一帧的更新数, 最近一帧的跳过数)
+        前两项为所有页面的累计值
+        """
+        applied = skipped = 0
+        for page in self.pages:
+            binder = getattr(page, 'binder', None)
+            if binder is not None:
+                applied += binder.applied
+                skipped += binder.skipped
+        binder = getattr(self.current_page, 'binder', None)
+        if binder is None:
+            return applied, skipped, 0, 0
+        return applied, skipped, binder.frame_applied, binder.frame_skipped
+    
+    def render_current_page(self, data):
+        """只按最新一帧刷新当前页面"""
+        if self.current_page:
+            self.current_page.render(data)
+    
     def check_touch_and_switch(self):
         """检查触摸输入并切换页面（在主循环中调用）"""
         if len(self.pages) <= 1:
@@ -3,9 +3,16 @@
 """
 import lvgl as lv
 from config import THEME, LAYOUT, SCREEN
-from ui_components import (create_label, create_card, make_bar, 
+from frame_codec import civil_from_days
+from ui_components import (Binder, create_label, create_card, make_bar,
                           format_bytes, get_warn_indicator, get_performance_score)
 
+def format_sent(value):
+    return f"^ {format_bytes(value)}/s"
+
+def format_recv(value):
+    return f"v {format_bytes(value)}/s"
+
 class MonitorPage:
     """系统监控页面类"""
     
@@ -21,11 +28,19 @@ class MonitorPage:
         self.cpu_sum = 0
         self.mem_sum = 0
         self.indicator_state = 0
+        self.last_blink = 0
+        self.avg_cpu = 0
+        self.avg_mem = 0
+        self.avg_changed = False
+        self.clock_day = -1
+        self.binder = Binder()  # 每帧刷新的标签只在内容变化时重绘
         
         self._create_ui()
     
     def _create_ui(self):
         """创建UI元素"""
+        bind = self.binder.bind
+        
         # 标题和状态指示灯
         self.title_label = create_label(self.scr, 10, 8, "SYSTEM MONITOR", 'text_title')
         self.status_indicator = create_label(self.scr, 460, 8, "●", 'indicator_on')
@@ -55,16 +70,16 @@ class MonitorPage:
         # CPU 信息
         cpu_icon = create_label(card_performance, 5, 5, "[C]", 'text_cpu')
         cpu_label = create_label(card_performance, 30, 5, "CPU", 'text_cpu')
-        self.cpu_value = create_label(card_performance, 145, 5, "0.0%", 'text_cpu')
-        self.cpu_warn = create_label(card_performance, 195, 5, "", 'text_cpu')
-        self.cpu_bar_label = create_label(card_performance, 30, 22, "[==========]", 'text_cpu')
+        self.cpu_value = bind(create_label(card_performance, 145, 5, "0.0%", 'text_cpu'))
+        self.cpu_warn = bind(create_label(card_performance, 195, 5, "", 'text_cpu'))
+        self.cpu_bar_label = bind(create_label(card_performance, 30, 22, "[==========]", 'text_cpu'))
         
         # 内存信息
         mem_icon = create_label(card_performance, 5, 70, "[M]", 'text_memory')
         memory_label = create_label(card_performance, 30, 70, "Memory", 'text_memory')
-        self.memory_value = create_label(card_performance, 145, 70, "0.0%", 'text_memory')
-        self.mem_warn = create_label(card_performance, 195, 70, "", 'text_memory')
-        self.mem_bar_label = create_label(card_performance, 30, 87, "[==========]", 'text_memory')
+        self.memory_value = bind(create_label(card_performance, 145, 70, "0.0%", 'text_memory'))
+        self.mem_warn = bind(create_label(card_performance, 195, 70, "", 'text_memory'))
+        self.mem_bar_label = bind(create_label(card_performance, 30, 87, "[==========]", 'text_memory'))
         
         # === 卡片2内容：系统信息 ===
         # 时间信息
@@ -76,78 +91,98 @@ class MonitorPage:
         # 进程信息
         proc_icon = create_label(card_system, 5, 70, "[P]", 'text_process')
         process_label = create_label(card_system, 30, 70, "Processes", 'text_process')
-        self.process_value = create_label(card_system, 30, 87, "0", 'text_process')
+        self.process_value = bind(create_label(card_system, 30, 87, "0", 'text_process'))
         
         # === 卡片3内容：网络和统计 ===
         # 网络信息
         net_icon = create_label(card_network, 5, 5, "[N]", 'text_network')
         net_label = create_label(card_network, 30, 5, "Network", 'text_network')
-        self.net_sent_label = create_label(card_network, 30, 22, "^ 0B", 'text_network')
-        self.net_recv_label = create_label(card_network, 160, 22, "v 0B", 'text_network')
+        self.net_sent_label = bind(create_label(card_network, 30, 22, "^ 0B", 'text_network'))
+        self.net_recv_label = bind(create_label(card_network, 160, 22, "v 0B", 'text_network'))
         
         # 统计信息 - 左列
         stats_icon = create_label(card_network, 5, 50, "[#]", 'text_stats')
-        self.stats_label = create_label(card_network, 30, 50, "00000", 'text_stats')
-        self.avg_label = create_label(card_network, 30, 67, "C-0% M-0%", 'text_avg')
+        self.stats_label = bind(create_label(card_network, 30, 50, "00000", 'text_stats'))
+        self.avg_label = bind(create_label(card_network, 30, 67, "C-0% M-0%", 'text_avg'))
         
         # 统计信息 - 右列
         max_icon = create_label(card_network, 240, 50, "MAX", 'text_max')
-        self.max_label = create_label(card_network, 270, 50, "C-0% M-0%", 'text_max')
+        self.max_label = bind(create_label(card_network, 270, 50, "C-0% M-0%", 'text_max'))
         perf_icon = create_label(card_network, 240, 67, "Score", 'text_score')
-        self.performance_label = create_label(card_network, 280, 67, "A", 'text_score')
+        self.performance_label = bind(create_label(card_network, 280, 67, "A", 'text_score'))
     
     def update(self, data):
         """更新页面数据"""
+        self.record(data)
+        self.render(data)
+    
+    def record(self, data):
+        """把一帧数据计入统计（不刷新界面），帧合并时每帧都会调用"""
         self.update_count = (self.update_count + 1) % 10000
         
-        # 更新时间
-        time_str = data['time']
-        self.time_value.set_text(f"{time_str[:10]}")
-        self.time_detail.set_text(f"{time_str[11:]}")
-        
-        # 更新CPU
         cpu_val = data['cpu']
         self.cpu_sum += cpu_val
         if cpu_val > self.max_cpu:
             self.max_cpu = cpu_val
-        self.cpu_value.set_text(f"{cpu_val:.1f}%")
-        self.cpu_bar_label.set_text(make_bar(cpu_val))
-        self.cpu_warn.set_text(get_warn_indicator(cpu_val))
         
-        # 更新内存
         mem_val = data['memory']
         self.mem_sum += mem_val
         if mem_val > self.max_memory:
             self.max_memory = mem_val
-        self.memory_value.set_text(f"{mem_val:.1f}%")
-        self.mem_bar_label.set_text(make_bar(mem_val))
-        self.mem_warn.set_text(get_warn_indicator(mem_val))
+        
+        # 每100次计算平均值
+        if self.update_count % 100 == 0:
+            self.avg_cpu = self.cpu_sum / 100
+            self.avg_mem = self.mem_sum / 100
+            self.avg_changed = True
+            self.cpu_sum = 0
+            self.mem_sum = 0
+    
+    def tick(self, ts):
+        """设备时钟每秒调用一次，ts为当前秒数；日期只在跨天时更新"""
+        days, secs = divmod(ts, 86400)
+        if days != self.clock_day:
+            self.clock_day = days
+            self.time_value.set_text("%04d-%02d-%02d" % civil_from_days(days))
+        self.time_detail.set_text("%02d:%02d:%02d" % (secs // 3600, secs // 60 % 60, secs % 60))
+    
+    def render(self, data):
+        """按最新一帧刷新界面（时间由 tick 更新），内容未变的标签不会重绘"""
+        self.binder.begin_frame()
+        
+        # 更新CPU
+        cpu_val = data['cpu']
+        self.cpu_value.set_value(cpu_val, "%.1f%%")
+        self.cpu_bar_label.set_value(cpu_val, make_bar)
+        self.cpu_warn.set_value(cpu_val, get_warn_indicator)
+        
+        # 更新内存
+        mem_val = data['memory']
+        self.memory_value.set_value(mem_val, "%.1f%%")
+        self.mem_bar_label.set_value(mem_val, make_bar)
+        self.mem_warn.set_value(mem_val, get_warn_indicator)
         
         # 更新进程
-        self.process_value.set_text(f"{data['processes']}")
+        self.process_value.set_value(data['processes'], "%d")
         
         # 更新网络
-        sent_formatted = format_bytes(data['net_sent'])
-        recv_formatted = format_bytes(data['net_recv'])
-        self.net_sent_label.set_text(f"^ {sent_formatted}/s")
-        self.net_recv_label.set_text(f"v {recv_formatted}/s")
+        self.net_sent_label.set_value(data['net_sent'], format_sent)
+        self.net_recv_label.set_value(data['net_recv'], format_recv)
         
         # 更新统计信息
-        self.stats_label.set_text(f"{self.update_count:05d}")
-        self.max_label.set_text(f"C-{self.max_cpu:.0f}% M-{self.max_memory:.0f}%")
+        self.stats_label.set_value(self.update_count, "%05d")
+        self.max_label.set_value((self.max_cpu, self.max_memory), "C-%.0f%% M-%.0f%%")
         
-        # 每100次计算平均值
-        if self.update_count % 100 == 0:
-            avg_cpu = self.cpu_sum / 100
-            avg_mem = self.mem_sum / 100
-            self.avg_label.set_text(f"C-{avg_cpu:.0f}% M-{avg_mem:.0f}%")
-            score = get_performance_score(avg_cpu, avg_mem)
+        if self.avg_changed:
+            self.avg_changed = False
+            self.avg_label.set_text(f"C-{self.avg_cpu:.0f}% M-{self.avg_mem:.0f}%")
+            score = get_performance_score(self.avg_cpu, self.avg_mem)
             self.performance_label.set_text(f"{score}")
-            self.cpu_sum = 0
-            self.mem_sum = 0
         
-        # 指示灯闪烁
-        if self.update_count % 5 == 0:
+        # 指示灯闪烁（每5次更新切换一次，合并的帧也计入）
+        blink = self.update_count // 5
+        if blink != self.last_blink:
+            self.last_blink = blink
             self.indicator_state = 1 - self.indicator_state
             color_key = 'indicator_on' if self.indicator_state == 0 else 'indicator_off'
             self.status_indicator.set_style_text_color(lv.color_hex(THEME[color_key]), 0)
@@ -1,9 +1,55 @@
 """
 趋势页面 - 显示CPU、内存、网络上传下载的趋势图
+
+chart模式（默认）：每个图表是一条lv.chart折线，点数在创建时固定，更新模式为SHIFT，
+每次刷新只把上次刷新后新增的点用 set_next_value 推入，LVGL只重绘图表区域，不再每帧拼接字符串。
+历史保存在定长环形缓冲区中（见 ring_buffer.py），CPU/内存以0.1%为单位的整数保存和绘制；网络图表按窗口内最大值自动选择量程（1/2/5倍的整数档），
+点值换算为量程的千分之几，量程变化时才重新推入整个窗口。窗口最大值由环形缓冲区的单调队列O(1)给出；
+量程超出时立即放大，最大值低于量程的 SCALE_SHRINK_RATIO 时才缩小，避免在档位边界来回切换、整窗重绘。
+ascii模式保留旧的字符画图表（config.py 中的 TREND['mode']）。
 """
 import lvgl as lv
-from config import THEME, LAYOUT, SCREEN
-from ui_components import create_label
+from config import THEME, LAYOUT, SCREEN, TREND
+from ring_buffer import RingBuffer
+from ui_components import create_label, format_bytes
+
+# lv.chart中表示“无数据”的点值（LV_CHART_POINT_NONE）
+CHART_POINT_NONE = 0x7FFF
+
+# 纵轴刻度数：CPU/内存每格0.1%，网络图表每格为量程的千分之一
+CHART_RANGE = 1000
+
+# 网络图表的量程档位（字节/秒）：1/2/5 × 10^n，KB/MB按1024换算，与 format_bytes 的显示一致
+NET_SCALES = ([100, 200, 500]
+              + [m * 1024 for m in (1, 2, 5, 10, 20, 50, 100, 200, 500)]
+              + [m * 1024 * 1024 for m in (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)])
+
+# 窗口最大值低于当前量程的这个比例时才缩小量程
+SCALE_SHRINK_RATIO = 0.3
+
+def nice_scale(value):
+    """不小于value的最小档位，量程只在跨档时变化"""
+    for scale in NET_SCALES:
+        if scale >= value:
+            return scale
+    return NET_SCALES[-1]
+
+class AutoScale:
+    """带滞回的自动量程：超出时立即放大，明显变小时才缩小"""
+
+    def __init__(self):
+        self.scale = 0
+        self.changes = 0
+
+    def update(self, peak):
+        """按窗口最大值更新量程，量程变化时返回True"""
+        if self.scale == 0 or peak > self.scale or peak < self.scale * SCALE_SHRINK_RATIO:
+            scale = nice_scale(peak)
+            if scale != self.scale:
+                self.scale = scale
+                self.changes += 1
+                return True
+        return False
 
 class TrendPage:
     """趋势页面类"""
@@ -13,12 +59,18 @@ class TrendPage:
         self.scr = lv.obj()
         self.scr.set_style_bg_color(lv.color_hex(THEME['bg_primary']), 0)
 
-        # 初始化数据历史记录
-        self.max_points = 50  # 最多显示50个数据点
-        self.cpu_history = []
-        self.mem_history = []
-        self.up_history = []
-        self.down_history = []
+        # 初始化数据历史记录：定长环形缓冲区，CPU/内存为百分比×10
+        self.max_points = TREND['points']  # 每个图表显示的数据点数
+        self.chart_mode = TREND['mode'] == 'chart'
+        self.cpu_history = RingBuffer(self.max_points, 'h')
+        self.mem_history = RingBuffer(self.max_points, 'h')
+        self.up_history = RingBuffer(self.max_points, 'I', extrema=True)
+        self.down_history = RingBuffer(self.max_points, 'I', extrema=True)
+
+        # chart模式：上次刷新后新增的点数，需要整窗重绘时为max_points
+        self.pending = 0
+        self.up_scale = AutoScale()
+        self.down_scale = AutoScale()
 
         self._create_ui()
 
@@ -39,25 +91,27 @@ class TrendPage:
         self.cpu_container = self._create_trend_container(
             10, 35, container_width, container_height, "CPU %", 'text_cpu'
         )
-        self.cpu_chart = self._create_chart(self.cpu_container)
+        self.cpu_chart = self._create_chart(self.cpu_container, 'text_cpu')
 
         # MEM趋势图 - 右上
         self.mem_container = self._create_trend_container(
             20 + container_width, 35, container_width, container_height, "MEM %", 'text_memory'
         )
-        self.mem_chart = self._create_chart(self.mem_container)
+        self.mem_chart = self._create_chart(self.mem_container, 'text_memory')
 
         # UP趋势图 - 左下
         self.up_container = self._create_trend_container(
             10, 45 + container_height, container_width, container_height, "UP B/s", 'text_network'
         )
-        self.up_chart = self._create_chart(self.up_container)
+        self.up_chart = self._create_chart(self.up_container, 'text_network')
+        self.up_scale_label = create_label(self.up_container, container_width - 70, 5, "", 'text_time_dim')
 
         # DOWN趋势图 - 右下
         self.down_container = self._create_trend_container(
             20 + container_width, 45 + container_height, container_width, container_height, "DOWN B/s", 'text_network'
         )
-        self.down_chart = self._create_chart(self.down_container)
+        self.down_chart = self._create_chart(self.down_container, 'text_network')
+        self.down_scale_label = create_label(self.down_container, container_width - 70, 5, "", 'text_time_dim')
 
     def _create_trend_container(self, x, y, width, height, title, title_style):
         """创建单个趋势图容器"""
@@ -76,7 +130,36 @@ class TrendPage:
 
         return container
 
-    def _create_chart(self, parent):
+    def _create_chart(self, parent, color_key):
+        """在容器中创建图表，chart模式返回 (chart, series)，ascii模式返回字符画标签"""
+        if self.chart_mode:
+            return self._create_line_chart(parent, color_key)
+        return self._create_ascii_chart(parent)
+
+    def _create_line_chart(self, parent, color_key):
+        """创建折线图，点数固定为max_points，新点从右侧推入"""
+        chart = lv.chart(parent)
+        chart.set_size(parent.get_width() - 10, parent.get_height() - 30)
+        chart.set_pos(5, 25)
+        chart.set_type(lv.chart.TYPE.LINE)
+        chart.set_update_mode(lv.chart.UPDATE_MODE.SHIFT)
+        chart.set_point_count(self.max_points)
+        chart.set_range(lv.chart.AXIS.PRIMARY_Y, 0, CHART_RANGE)
+        chart.set_div_line_count(3, 0)
+        chart.set_style_bg_opa(0, 0)
+        chart.set_style_border_width(0, 0)
+        chart.set_style_pad_all(0, 0)
+        chart.set_style_line_color(lv.color_hex(THEME['divider']), 0)
+        # 不画数据点，只画折线
+        chart.set_style_width(0, lv.PART.INDICATOR)
+        chart.set_style_height(0, lv.PART.INDICATOR)
+        chart.add_flag(lv.obj.FLAG.EVENT_BUBBLE)
+
+        series = chart.add_series(lv.color_hex(THEME[color_key]), lv.chart.AXIS.PRIMARY_Y)
+        chart.set_all_value(series, CHART_POINT_NONE)
+        return chart, series
+
+    def _create_ascii_chart(self, parent):
         """在容器中创建字符画图表"""
         # 创建标签来显示字符画
         chart_label = lv.label(parent)
@@ -100,62 +183,103 @@ class TrendPage:
 
     def update(self, data):
         """更新趋势图显示"""
+        self.record(data)
+        self.render(data)
+
+    def record(self, data):
+        """把一帧数据加入历史（不刷新界面），帧合并时每帧都会调用"""
         try:
-            # 更新数据历史
             self._update_data_history(data)
+            if self.pending < self.max_points:
+                self.pending += 1
+        except Exception as e:
+            print(f"Trend page update error: {e}")
 
-            # 更新各个图表
+    def render(self, data):
+        """按当前历史刷新图表"""
+        try:
             self._update_charts()
-
         except Exception as e:
             print(f"Trend page update error: {e}")
 
     def _update_data_history(self, data):
-        """更新数据历史记录"""
-        # CPU数据
-        cpu_value = data['cpu']
-        self.cpu_history.append(cpu_value)
-        if len(self.cpu_history) > self.max_points:
-            self.cpu_history.pop(0)
-
-        # 内存数据
-        mem_value = data['memory']
-        self.mem_history.append(mem_value)
-        if len(self.mem_history) > self.max_points:
-            self.mem_history.pop(0)
-
-        # 上传数据
-        up_value = data['net_sent']
-        self.up_history.append(up_value)
-        if len(self.up_history) > self.max_points:
-            self.up_history.pop(0)
-
-        # 下载数据
-        down_value = data['net_recv']
-        self.down_history.append(down_value)
-        if len(self.down_history) > self.max_points:
-            self.down_history.pop(0)
+        """更新数据历史记录，每个缓冲区O(1)写入"""
+        self.cpu_history.push(int(data['cpu'] * 10 + 0.5))
+        self.mem_history.push(int(data['memory'] * 10 + 0.5))
+        self.up_history.push(data['net_sent'])
+        self.down_history.push(data['net_recv'])
+
+    def load_history(self, rows, replace=False):
+        """
+        批量载入回填的历史，rows为 (cpu, memory, net_sent, net_recv) 列表，旧的在前
+        replace为True时先清空已有历史（一次回填的第一批）；超过max_points的部分直接被覆盖
+        """
+        histories = (self.cpu_history, self.mem_history, self.up_history, self.down_history)
+        if replace:
+            for history in histories:
+                history.clear()
+        start = max(0, len(rows) - self.max_points)
+        for k in range(start, len(rows)):
+            cpu, memory, net_sent, net_recv = rows[k]
+            self.cpu_history.push(int(cpu * 10 + 0.5))
+            self.mem_history.push(int(memory * 10 + 0.5))
+            self.up_history.push(net_sent)
+            self.down_history.push(net_recv)
+        self.pending = self.max_points
 
     def _update_charts(self):
         """更新所有图表显示"""
+        if self.chart_mode:
+            self._update_line_charts()
+            return
+
         # 更新CPU图表
-        self._update_single_chart(self.cpu_chart, self.cpu_history, 0, 100)
+        self._update_single_chart(self.cpu_chart, self.cpu_history, 0, 1000)
 
         # 更新内存图表
-        self._update_single_chart(self.mem_chart, self.mem_history, 0, 100)
+        self._update_single_chart(self.mem_chart, self.mem_history, 0, 1000)
 
         # 更新上传图表 - 根据数据范围调整
         if self.up_history:
-            max_up = max(self.up_history)
+            max_up = self.up_history.max()
             up_range = max(100, max_up * 1.2)  # 至少100，至少比最大值大20%
             self._update_single_chart(self.up_chart, self.up_history, 0, int(up_range))
 
         # 更新下载图表 - 根据数据范围调整
         if self.down_history:
-            max_down = max(self.down_history)
+            max_down = self.down_history.max()
             down_range = max(100, max_down * 1.2)  # 至少100，至少比最大值大20%
             self._update_single_chart(self.down_chart, self.down_history, 0, int(down_range))
 
+    def _update_line_charts(self):
+        """把上次刷新后新增的点推入各折线；网络量程变化时重新推入整个窗口"""
+        count = self.pending
+        self.pending = 0
+        if count == 0:
+            return
+        self._push(self.cpu_chart, self.cpu_history, count, 1, 1)
+        self._push(self.mem_chart, self.mem_history, count, 1, 1)
+
+        self._update_net_chart(self.up_chart, self.up_scale_label, self.up_scale, self.up_history, count)
+        self._update_net_chart(self.down_chart, self.down_scale_label, self.down_scale, self.down_history, count)
+
+    def _update_net_chart(self, chart, scale_label, auto_scale, history, count):
+        """网络图表：量程变化时重新推入整个窗口，否则只推入新增的点"""
+        if auto_scale.update(history.max()):
+            scale_label.set_text(format_bytes(auto_scale.scale) + "/s")
+            count = self.max_points
+        self._push(chart, history, count, CHART_RANGE, auto_scale.scale)
+
+    def _push(self, chart_series, history, count, mul, div):
+        """把history最后count个值换算为 value * mul // div 推入折线，不足count个时前面补空点"""
+        chart, series = chart_series
+        n = len(history)
+        for i in range(n - count, n):
+            if i < 0:
+                chart.set_next_value(series, CHART_POINT_NONE)
+            else:
+                chart.set_next_value(series, history[i] * mul // div)
+
     def _update_single_chart(self, chart_label, data, y_min, y_max):
         """更新单个字符画图表"""
         if not data:
@@ -177,7 +301,7 @@ class TrendPage:
 
         # 归一化数据到0-height范围
         normalized_data = []
-        for value in data[-width:]:  # 只取最后width个数据点
+        for value in data.window(width):  # 只取最后width个数据点，不复制
             if y_max > y_min:
                 normalized = int((value - y_min) / (y_max - y_min) * (height - 1))
                 normalized = max(0, min(height - 1, normalized))
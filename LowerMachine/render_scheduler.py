@@ -0,0 +1,123 @@
+"""
+刷新调度 - 数据到达只标记页面需要刷新，按最高帧率统一刷新一次屏幕
+
+原来每收到一帧就更新标签并调用 lv.refr_now()，在 lv_utils.event_loop 每秒25次的定时刷新之外
+再强制同步重绘一次，数据密集时大部分时间都花在重绘上。这里改为:
+    mark(reason)  数据、触摸、回填、时钟等任何需要刷新的事件只记录原因，多次标记合并为一帧
+    刷新时机      距上一帧不少于 1000/max_fps 毫秒；但从第一次标记起不超过 deadline_ms，
+                  保证数据到屏幕的延迟有上限
+    刷新          调用 render(reasons) 更新标签，再 lv.refr_now() 绘制一次，绘制完成后调用 done(reasons)
+
+统计: frames 帧数、skipped 合并掉的标记（未单独刷新）、late 超过deadline的帧、
+frame_ms/max_frame_ms 每帧耗时（更新标签+绘制）、latency_ms 从标记到开始绘制的平均延迟、
+reasons 各原因触发的帧数。report() 以 {"type": "render", ...} 上报给上位机。
+
+由 app.py 的render任务运行 run()。
+"""
+import time
+
+import lvgl as lv
+import uasyncio
+
+# 刷新原因（可组合）
+REASON_DATA = 0x01
+REASON_TOUCH = 0x02
+REASON_BACKFILL = 0x04
+REASON_CLOCK = 0x08
+REASON_NAMES = ('data', 'touch', 'backfill', 'clock')
+
+
+class RenderScheduler:
+    """按帧率和延迟上限合并刷新"""
+
+    def __init__(self, render=None, done=None, max_fps=20, deadline_ms=100):
+        self.render = render                 # render(reasons)，在绘制前更新界面内容；可以为None
+        self.done = done                     # done(reasons)，绘制完成后调用（如回送确认）；可以为None
+        self.interval_ms = 1000 // max_fps
+        self.deadline_ms = deadline_ms
+        self.dirty = 0                       # 待刷新的原因
+        self.dirty_ticks = 0                 # 第一次标记的时刻
+        self.last_frame = time.ticks_add(time.ticks_ms(), -self.interval_ms)
+        self.event = None                    # run() 中创建
+
+        # 统计
+        self.frames = 0
+        self.skipped = 0
+        self.late = 0
+        self.frame_ms = 0
+        self.max_frame_ms = 0
+        self.latency_ms = 0
+        self.reasons = [0] * len(REASON_NAMES)
+
+    def mark(self, reason=REASON_DATA):
+        """标记需要刷新；同一原因在刷新前再次标记时合并，计入skipped"""
+        if not self.dirty:
+            self.dirty_ticks = time.ticks_ms()
+        elif self.dirty & reason:
+            self.skipped += 1
+        self.dirty |= reason
+        if self.event is not None:
+            self.event.set()
+
+    def wait_ms(self):
+        """距下一次可以刷新的毫秒数，没有待刷新内容时返回-1"""
+        if not self.dirty:
+            return -1
+        now = time.ticks_ms()
+        paced = time.ticks_diff(time.ticks_add(self.last_frame, self.interval_ms), now)
+        deadline = self.deadline_ms - time.ticks_diff(now, self.dirty_ticks)
+        return max(0, min(paced, deadline))
+
+    def _frame(self):
+        reasons = self.dirty
+        self.dirty = 0
+        start = time.ticks_ms()
+        latency = time.ticks_diff(start, self.dirty_ticks)
+        if latency > self.deadline_ms:
+            self.late += 1
+        for i in range(len(REASON_NAMES)):
+            if reasons & (1 << i):
+                self.reasons[i] += 1
+
+        try:
+            if self.render is not None:
+                self.render(reasons)
+            lv.refr_now()
+        except Exception as e:
+            print(f"Render error: {e}")
+
+        elapsed = time.ticks_diff(time.ticks_ms(), start)
+        if self.frames == 0:
+            self.frame_ms = elapsed
+            self.latency_ms = latency
+        else:
+            self.frame_ms = (self.frame_ms * 7 + elapsed) // 8
+            self.latency_ms = (self.latency_ms * 7 + latency) // 8
+        if elapsed > self.max_frame_ms:
+            self.max_frame_ms = elapsed
+        self.last_frame = start
+        self.frames += 1
+        if self.done is not None:
+            self.done(reasons)
+
+    async def run(self):
+        """uasyncio任务：等待标记，到时间后刷新"""
+        self.event = uasyncio.Event()
+        if self.dirty:
+            self.event.set()
+        while True:
+            await self.event.wait()
+            self.event.clear()
+            wait = self.wait_ms()
+            if wait < 0:
+                continue
+            if wait:
+                await uasyncio.sleep_ms(wait)
+            self._frame()
+
+    def report(self, out):
+        """上报计数"""
+        out.write('{"type": "render", "frames": %d, "skipped": %d, "late": %d, "frame_ms": %d, '
+                  '"max_frame_ms": %d, "latency_ms": %d, "data": %d, "touch": %d, "backfill": %d, "clock": %d}\n'
+                  % ((self.frames, self.skipped, self.late, self.frame_ms, self.max_frame_ms, self.latency_ms)
+                     + tuple(self.reasons)))
@@ -0,0 +1,157 @@
+"""
+定长环形缓冲区 - 趋势历史使用
+
+list.append + pop(0) 每次都要移动整个列表，切片 data[-n:] 还会再复制一份。
+这里把数值保存在启动时创建的 array 中，写入位置循环前进:
+    push     O(1)，写满后覆盖最旧的值，不分配内存
+    rb[i]    按时间顺序的下标，0为最旧、-1为最新
+    window   最近n个值的视图，按时间顺序遍历，不复制数据
+    max/min  窗口内的最大/最小值，O(1)（创建时 extrema=True）
+CPU/内存以百分比×10保存在 array('h')，网络速率保存在 array('I')，与 telemetry.py 的整数表示一致。
+
+窗口最值用单调队列维护：队列中保存值的位置，按写入顺序排列，对应的值单调递减（最大值）或递增（最小值），
+队首即为窗口最值。写入时从队尾弹出不再可能成为最值的位置，覆盖最旧的值时若它在队首则弹出，
+每个位置最多进出队列各一次，均摊O(1)。队列同样是启动时分配的定长数组。
+"""
+from array import array
+
+
+class _Monotonic:
+    """单调队列：保存buf中的位置，队首为窗口最大值（keep_max）或最小值"""
+
+    def __init__(self, capacity, keep_max):
+        self.pos = array('I', [0] * capacity)
+        self.capacity = capacity
+        self.keep_max = keep_max
+        self.first = 0
+        self.size = 0
+
+    def clear(self):
+        self.first = 0
+        self.size = 0
+
+    def expire(self, p):
+        """位置p上最旧的值即将被覆盖"""
+        if self.size and self.pos[self.first] == p:
+            self.first += 1
+            if self.first == self.capacity:
+                self.first = 0
+            self.size -= 1
+
+    def add(self, buf, p, value):
+        """位置p写入了value"""
+        pos = self.pos
+        capacity = self.capacity
+        keep_max = self.keep_max
+        while self.size:
+            back = self.first + self.size - 1
+            if back >= capacity:
+                back -= capacity
+            v = buf[pos[back]]
+            if (v > value) if keep_max else (v < value):
+                break
+            self.size -= 1
+        back = self.first + self.size
+        if back >= capacity:
+            back -= capacity
+        pos[back] = p
+        self.size += 1
+
+    def value(self, buf):
+        return buf[self.pos[self.first]]
+
+
+class RingBuffer:
+    """保存最近capacity个整数"""
+
+    def __init__(self, capacity, typecode='i', extrema=False):
+        self.capacity = capacity
+        self.buf = array(typecode, [0] * capacity)
+        self.head = 0                # 下一次写入的位置
+        self.count = 0
+        if extrema:
+            self.maxq = _Monotonic(capacity, True)
+            self.minq = _Monotonic(capacity, False)
+        else:
+            self.maxq = self.minq = None
+
+    def __len__(self):
+        return self.count
+
+    def push(self, value):
+        """追加一个值，已满时覆盖最旧的值"""
+        p = self.head
+        self.buf[p] = value
+        if self.maxq is not None:
+            if self.count == self.capacity:
+                self.maxq.expire(p)
+                self.minq.expire(p)
+            self.maxq.add(self.buf, p, value)
+            self.minq.add(self.buf, p, value)
+        self.head += 1
+        if self.head == self.capacity:
+            self.head = 0
+        if self.count < self.capacity:
+            self.count += 1
+
+    def extend(self, values):
+        for value in values:
+            self.push(value)
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+        if self.maxq is not None:
+            self.maxq.clear()
+            self.minq.clear()
+
+    def max(self):
+        """窗口内的最大值，为空时返回0；需要 extrema=True"""
+        if self.count == 0:
+            return 0
+        return self.maxq.value(self.buf)
+
+    def min(self):
+        """窗口内的最小值，为空时返回0；需要 extrema=True"""
+        if self.count == 0:
+            return 0
+        return self.minq.value(self.buf)
+
+    def _index(self, i):
+        """按时间顺序的下标换算为buf中的位置"""
+        count = self.count
+        if i < 0:
+            i += count
+        if i < 0 or i >= count:
+            raise IndexError("ring buffer index out of range")
+        i += self.head - count
+        if i < 0:
+            i += self.capacity
+        return i
+
+    def __getitem__(self, i):
+        return self.buf[self._index(i)]
+
+    def latest(self):
+        """最新的值，为空时返回0"""
+        if self.count == 0:
+            return 0
+        return self.buf[self.head - 1]
+
+    def __iter__(self):
+        return self.window(self.count)
+
+    def window(self, n):
+        """按时间顺序遍历最近n个值（不足n个时遍历全部）"""
+        buf = self.buf
+        capacity = self.capacity
+        if n > self.count:
+            n = self.count
+        i = self.head - n
+        if i < 0:
+            i += capacity
+        for _ in range(n):
+            yield buf[i]
+            i += 1
+            if i == capacity:
+                i = 0
@@ -0,0 +1,322 @@
+"""
+定长遥测状态 - 按固定字段解析，结果写入预先分配的槽位
+
+ujson.loads 每帧都会新建字典、时间字符串和浮点数对象。这里针对已知的字段
+（time, cpu, memory, processes, net_sent, net_recv）直接扫描JSON行或二进制帧，
+把数值写入启动时创建的 array('I')，与完整帧负载使用相同的整数表示：
+    time         1970-01-01起的秒数（JSON中为整数秒；旧版上位机的时间字符串也解析为秒数）
+    cpu, memory  百分比×10
+    其余          整数
+解析过程中不创建浮点数和字符串（时间戳超过小整数范围，读写时会有一个临时大整数）。
+带序号的帧另外记录 seq 和 ts（上位机发送时间戳），没有时为-1，用于 link.py 的统计和确认。
+
+页面仍可按 data['cpu'] 的方式读取，此时才换算为显示用的值。
+"""
+from array import array
+
+from frame_codec import (FRAME_MAGIC, FRAME_TYPE_FULL, FRAME_TYPE_DELTA, FRAME_FLAG_STAMPED,
+                         STAMP_SIZE, HEADER_SIZE, FULL_SIZE, FIELDS, FIELD_SIZES,
+                         days_from_civil, format_time)
+
+# 槽位下标，与 FIELDS 顺序一致
+TIME = 0
+CPU = 1
+MEMORY = 2
+PROCESSES = 3
+NET_SENT = 4
+NET_RECV = 5
+# 序号和发送时间戳只在解析JSON行时暂存在pending中
+SEQ = 6
+TS = 7
+
+# 各字段的缩放倍数（含序号和时间戳）
+SCALES = (1, 10, 10, 1, 1, 1, 1, 1)
+
+_KEYS = tuple(key.encode() for key in FIELDS) + (b'seq', b'ts')
+_FIELD_MASK = (1 << len(FIELDS)) - 1
+_DELTA_KEY = b'd'
+_UINT32_MAX = 0xFFFFFFFF
+# 数值最多保留的有效位数，足以表示uint32，更多的位只用于计算数量级
+_MAX_DIGITS = 10
+
+
+def _read_uint(buf, offset, size):
+    """读取小端无符号整数"""
+    value = 0
+    for i in range(size - 1, -1, -1):
+        value = (value << 8) | buf[offset + i]
+    return value
+
+
+def _skip_space(buf, i, end):
+    while i < end and buf[i] in (32, 9, 13, 10):
+        i += 1
+    return i
+
+
+def _match_key(buf, start, stop):
+    """返回 buf[start:stop] 对应的字段下标；是增量标记返回-1，未知键返回-2"""
+    n = stop - start
+    for index in range(len(_KEYS)):
+        key = _KEYS[index]
+        if len(key) == n:
+            i = 0
+            while i < n and buf[start + i] == key[i]:
+                i += 1
+            if i == n:
+                return index
+    if n == 1 and buf[start] == _DELTA_KEY[0]:
+        return -1
+    return -2
+
+
+def _digits(buf, i, end, count):
+    """读取count位十进制数字"""
+    value = 0
+    for _ in range(count):
+        if i >= end or not 48 <= buf[i] <= 57:
+            raise ValueError("bad time")
+        value = value * 10 + buf[i] - 48
+        i += 1
+    return value
+
+
+def _parse_time(buf, i, end, slots, index):
+    """解析 "YYYY-MM-DD HH:MM:SS"（i指向引号后的第一个字符），秒数写入slots[index]，返回结束引号之后的位置"""
+    year = _digits(buf, i, end, 4)
+    month = _digits(buf, i + 5, end, 2)
+    day = _digits(buf, i + 8, end, 2)
+    hour = _digits(buf, i + 11, end, 2)
+    minute = _digits(buf, i + 14, end, 2)
+    second = _digits(buf, i + 17, end, 2)
+    i += 19
+    if i >= end or buf[i] != 34:
+        raise ValueError("bad time")
+    slots[index] = days_from_civil(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+    return i + 1
+
+
+def _parse_number(buf, i, end, slots, index):
+    """
+    解析JSON数值，乘以缩放倍数并四舍五入后写入slots[index]，返回数值之后的位置；格式不对时返回-1
+    与上位机 quantize() 一致，负数记为0，超出uint32的记为最大值；支持指数（如 1.5e3）
+    """
+    negative = i < end and buf[i] == 45
+    if negative:
+        i += 1
+    mantissa = 0
+    digits = 0         # mantissa中的有效位数，超过_MAX_DIGITS的位不再累加
+    shift = 0          # mantissa还需乘以10的幂
+    start = i
+    while i < end and 48 <= buf[i] <= 57:
+        if digits < _MAX_DIGITS:
+            mantissa = mantissa * 10 + buf[i] - 48
+            if mantissa:
+                digits += 1
+        else:
+            shift += 1
+        i += 1
+    if i == start:
+        return -1
+    if i < end and buf[i] == 46:
+        i += 1
+        start = i
+        while i < end and 48 <= buf[i] <= 57:
+            if digits < _MAX_DIGITS:
+                mantissa = mantissa * 10 + buf[i] - 48
+                if mantissa:
+                    digits += 1
+                shift -= 1
+            i += 1
+        if i == start:
+            return -1
+    if i < end and buf[i] in (101, 69):
+        i += 1
+        sign = 1
+        if i < end and buf[i] in (43, 45):
+            sign = -1 if buf[i] == 45 else 1
+            i += 1
+        exponent = 0
+        start = i
+        while i < end and 48 <= buf[i] <= 57:
+            if exponent < 100:
+                exponent = exponent * 10 + buf[i] - 48
+            i += 1
+        if i == start:
+            return -1
+        shift += sign * exponent
+
+    if negative or mantissa == 0:
+        value = 0
+    else:
+        mantissa *= SCALES[index]
+        if shift >= 0:
+            value = _UINT32_MAX if shift > 10 else mantissa * 10 ** shift
+        elif shift < -_MAX_DIGITS - 1:
+            value = 0
+        else:
+            div = 10 ** -shift
+            value = (mantissa + div // 2) // div
+        if value > _UINT32_MAX:
+            value = _UINT32_MAX
+    slots[index] = value
+    return i
+
+
+def _skip_value(buf, i, end):
+    """跳过一个未知字段的值（字符串、数字或字面量）"""
+    if i < end and buf[i] == 34:
+        i += 1
+        while i < end and buf[i] != 34:
+            i += 2 if buf[i] == 92 else 1
+        return i + 1
+    while i < end and buf[i] not in (44, 125):
+        if buf[i] in (123, 91):
+            raise ValueError("nested value not supported")
+        i += 1
+    return i
+
+
+class Telemetry:
+    """一帧遥测数据的预分配存储"""
+
+    def __init__(self):
+        self.values = array('I', [0] * len(FIELDS))
+        self.pending = array('I', [0] * len(_KEYS))    # 解析中的JSON行，确认可用后再写入values
+        self.seen = 0          # 已收到过的字段（位掩码）
+        self.changed = 0       # 最近一帧携带的字段（位掩码），如增量帧不带time时TIME位为0
+        self.synced = False    # 是否已收到完整关键帧
+        self.seq = -1          # 最近一帧的序号，不带序号时为-1
+        self.ts = -1           # 最近一帧的上位机发送时间戳（毫秒）
+
+    # --- 按键读取，兼容字典用法 ---
+
+    def __getitem__(self, key):
+        index = FIELDS.index(key)
+        if not self.seen & (1 << index):
+            raise KeyError(key)
+        value = self.values[index]
+        if index == TIME:
+            return format_time(value)
+        if SCALES[index] != 1:
+            return value / SCALES[index]
+        return value
+
+    def __contains__(self, key):
+        return key in FIELDS and bool(self.seen & (1 << FIELDS.index(key)))
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def as_dict(self):
+        return {key: self[key] for key in FIELDS if key in self}
+
+    def __repr__(self):
+        return repr(self.as_dict())
+
+    # --- 解码 ---
+
+    def decode(self, buf):
+        """
+        解码一条完整消息（二进制帧，或去掉换行符的JSON行）
+        返回True表示values已更新；收到第一个完整关键帧之前的增量帧被丢弃
+        """
+        if buf[0] == FRAME_MAGIC:
+            return self._decode_frame(buf)
+        return self._decode_json(buf)
+
+    def _decode_frame(self, buf):
+        frame_type = buf[2]
+        length = buf[3] | (buf[4] << 8)
+        offset = HEADER_SIZE
+        stamped = frame_type & FRAME_FLAG_STAMPED
+        if stamped:
+            if length < STAMP_SIZE:
+                return False
+            frame_type &= ~FRAME_FLAG_STAMPED
+            offset += STAMP_SIZE
+            length -= STAMP_SIZE
+        values = self.values
+        if frame_type == FRAME_TYPE_FULL and length >= FULL_SIZE:
+            for i in range(len(FIELDS)):
+                values[i] = _read_uint(buf, offset, FIELD_SIZES[i])
+                offset += FIELD_SIZES[i]
+            self.seen = self.changed = _FIELD_MASK
+            self.synced = True
+        elif frame_type == FRAME_TYPE_DELTA and length >= 1 and self.synced:
+            mask = buf[offset]
+            self.changed = mask & _FIELD_MASK
+            end = offset + length
+            offset += 1
+            for i in range(len(FIELDS)):
+                if mask & (1 << i):
+                    if offset + FIELD_SIZES[i] > end:
+                        raise ValueError("truncated delta frame")
+                    values[i] = _read_uint(buf, offset, FIELD_SIZES[i])
+                    offset += FIELD_SIZES[i]
+        else:
+            return False
+        if stamped:
+            self.seq = _read_uint(buf, HEADER_SIZE, 2)
+            self.ts = _read_uint(buf, HEADER_SIZE + 2, 4)
+        else:
+            self.seq = self.ts = -1
+        return True
+
+    def _decode_json(self, buf):
+        pending = self.pending
+        end = len(buf)
+        i = _skip_space(buf, 0, end)
+        if i >= end or buf[i] != 123:
+            raise ValueError("expected JSON object")
+        i += 1
+        mask = 0
+        delta = False
+        while True:
+            i = _skip_space(buf, i, end)
+            if i < end and buf[i] == 125:
+                break
+            if i >= end or buf[i] != 34:
+                raise ValueError("expected key")
+            start = i + 1
+            i = start
+            while i < end and buf[i] != 34:
+                i += 1
+            index = _match_key(buf, start, i)
+            i = _skip_space(buf, i + 1, end)
+            if i >= end or buf[i] != 58:
+                raise ValueError("expected ':'")
+            i = _skip_space(buf, i + 1, end)
+
+            if index == TIME and i < end and buf[i] == 34:
+                i = _parse_time(buf, i + 1, end, pending, TIME)
+            elif index >= 0:
+                i = _parse_number(buf, i, end, pending, index)
+                if i < 0:
+                    return False
+            else:
+                delta = delta or index == -1
+                i = _skip_value(buf, i, end)
+            if index >= 0:
+                mask |= 1 << index
+
+            i = _skip_space(buf, i, end)
+            if i < end and buf[i] == 44:
+                i += 1
+
+        if delta and not self.synced:
+            return False
+        if not delta:
+            self.synced = True
+        values = self.values
+        for index in range(len(FIELDS)):
+            if mask & (1 << index):
+                values[index] = pending[index]
+        self.changed = mask & _FIELD_MASK
+        self.seen |= self.changed
+        if mask & (1 << SEQ) and mask & (1 << TS):
+            self.seq = pending[SEQ]
+            self.ts = pending[TS]
+        else:
+            self.seq = self.ts = -1
+        return True
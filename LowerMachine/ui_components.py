@@ -14,6 +14,65 @@ def create_label(parent, x, y, text, color_key, font=None):
         label.set_style_text_font(font, 0)
     return label
 
+class Binder:
+    """
+    标签绑定：缓存每个标签最近一次显示的文本，只在文本变化时调用set_text
+    LVGL的set_text即使文本相同也会重新排版并使标签区域失效重绘，系统平稳时大部分标签都不变
+    """
+
+    def __init__(self):
+        self.labels = []
+        # 累计计数
+        self.applied = 0
+        self.skipped = 0
+        # 最近一帧的计数，随统计一起上报（见 PageManager.label_stats）
+        self.frame_applied = 0
+        self.frame_skipped = 0
+
+    def bind(self, label):
+        """绑定一个已创建的标签，返回BoundLabel"""
+        bound = BoundLabel(self, label)
+        self.labels.append(bound)
+        return bound
+
+    def begin_frame(self):
+        """每帧刷新前调用，清零本帧计数"""
+        self.frame_applied = 0
+        self.frame_skipped = 0
+
+
+class BoundLabel:
+    """带缓存的标签，set_text/set_value在内容未变时直接返回"""
+
+    def __init__(self, binder, label):
+        self.binder = binder
+        self.label = label
+        self.text = None
+        self.value = None
+
+    def set_text(self, text):
+        binder = self.binder
+        if text == self.text:
+            binder.skipped += 1
+            binder.frame_skipped += 1
+            return False
+        self.text = text
+        self.label.set_text(text)
+        binder.applied += 1
+        binder.frame_applied += 1
+        return True
+
+    def set_value(self, value, fmt):
+        """按原始数值判断是否变化，未变化时连格式化也省去；fmt为格式化函数或 % 格式字符串"""
+        if value == self.value:
+            binder = self.binder
+            binder.skipped += 1
+            binder.frame_skipped += 1
+            return False
+        self.value = value
+        return self.set_text(fmt % value if isinstance(fmt, str) else fmt(value))
+
+
 def create_card(parent, x, y, w, h):
     """创建卡片式容器"""
     card = lv.obj(parent)